@@ -3,17 +3,34 @@
 
 import os
 import sys
-import time
-from datetime import datetime
-from typing import Dict, Any, List, Set
+import logging
+import argparse
+from concurrent.futures import Future
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set
 
 # Importar módulos personalizados
 from modules.utils import (cargar_configuracion, setup_logging, filtrar_parametros_prueba, 
                           gestionar_contador_busquedas, actualizar_contador_busquedas,
-                          guardar_punto_control, cargar_punto_control)
-from modules.buscador import GoogleBuscador
-from modules.extractor import ExtractorSelector
-from modules.gestor_datos import GestorDatos
+                          PuntoControl, guardar_punto_control, cargar_punto_control,
+                          normalizar_url, cargar_urls_vistas, registrar_urls_vistas,
+                          crear_sesion_http)
+
+__version__ = "1.0.0"
+
+class PasoBusqueda(NamedTuple):
+    """
+    Una búsqueda del plan (keyword en una comunidad o en una ciudad).
+    
+    Los cuatro primeros campos coinciden con los índices del punto de control,
+    de modo que comparar la tupla con ellos indica si el paso ya se ejecutó.
+    """
+    comunidad_idx: int
+    en_ciudad: bool
+    ciudad_idx: int
+    keyword_idx: int
+    comunidad: str
+    ciudad: str
+    keyword: str
 
 class Prospector:
     """
@@ -21,8 +38,13 @@ class Prospector:
     Implementa un diseño modular que separa responsabilidades.
     """
     
-    def __init__(self):
-        """Inicializa el prospector y sus componentes."""
+    def __init__(self, sector: Optional[str] = None):
+        """
+        Inicializa el prospector y sus componentes.
+        
+        Args:
+            sector: Sector de filtros_busqueda.json a usar; si no se indica se usa 'sector_activo'
+        """
         # Asegurar que existan los directorios necesarios
         os.makedirs('config', exist_ok=True)
         os.makedirs('results', exist_ok=True)
@@ -41,24 +63,55 @@ class Prospector:
         self.en_ciudad = False
         self.comunidades_completadas = set()
         
+        # Contador diario de búsquedas; se persiste por lotes (ver guardar_contador)
+        self.contador_busquedas = 0
+        self.fecha_contador = ""
+        self._contador_guardado = 0
+        self.contador_cada = 10
+        
+        # Extracciones en curso del último lote (se solapan con la siguiente búsqueda)
+        self.pendientes: List[Future] = []
+        # URLs ya extraídas cuyo registro en disco espera al próximo volcado de contactos
+        self._urls_extraidas: List[str] = []
+        
         try:
             # Cargar configuración
             self.config = cargar_configuracion()
             
+            # El sector indicado al crear el prospector tiene prioridad sobre el del archivo
+            if sector:
+                self.config.setdefault('filtros_busqueda', {})['sector_activo'] = sector
+                self.logger.info("Usando el sector '%s'", sector)
+            
+            self.contador_cada = self.config.get('guardado', {}).get('contador_cada', 10)
+            
             # Ajustar configuración si estamos en modo prueba
             if self.config.get('modo_prueba', False):
                 self.config = filtrar_parametros_prueba(self.config)
                 self.logger.info("Ejecutando en MODO PRUEBA con parámetros limitados")
             
+            # Los módulos de búsqueda y extracción (requests, selenium) se
+            # importan aquí para que la línea de comandos arranque sin cargarlos
+            from modules.buscador import GoogleBuscador
+            from modules.extractor import DomainLimiter, ExtractorSelector
+            from modules.gestor_datos import GestorDatos
+            
             # Inicializar componentes
-            self.buscador = GoogleBuscador(self.config)
-            self.extractor = ExtractorSelector(self.config)
+            self.sesion = crear_sesion_http(self.config)  # conexiones reutilizadas en toda la ejecución
+            self.buscador = GoogleBuscador(self.config, sesion=self.sesion)
+            self.limitador = DomainLimiter(self.config['delays']['entre_extracciones'])
+            self.robots_cache = {}  # robots.txt por dominio, válido durante robots_cache_horas
+            self.extractor = ExtractorSelector(self.config, limitador=self.limitador,
+                                               robots_cache=self.robots_cache, sesion=self.sesion)
             self.gestor_datos = GestorDatos(self.config)
             
+            # URLs ya procesadas (en esta ejecución o en anteriores)
+            self.urls_vistas = cargar_urls_vistas()
+            
             self.logger.info("Sistema inicializado correctamente")
             
         except Exception as e:
-            self.logger.error(f"Error durante la inicialización: {str(e)}")
+            self.logger.error("Error durante la inicialización: %s", e)
             sys.exit(1)
     
     def actualizar_estado(self, comunidad="", comunidad_idx=None, keyword="", keyword_idx=None, 
@@ -79,222 +132,320 @@ class Prospector:
         if en_ciudad is not None:
             self.en_ciudad = en_ciudad
     
+    def filtrar_urls_nuevas(self, urls: List[str]) -> List[str]:
+        """
+        Descarta las URLs ya procesadas antes de pagar su descarga y análisis.
+        
+        Args:
+            urls: URLs devueltas por el buscador
+            
+        Returns:
+            URLs que no se han procesado todavía
+        """
+        nuevas = []
+        for url in urls:
+            url_normalizada = normalizar_url(url)
+            if url_normalizada in self.urls_vistas:
+                self.logger.info("Omitiendo URL ya procesada: %s", url)
+                continue
+            self.urls_vistas.add(url_normalizada)
+            nuevas.append(url)
+        return nuevas
+    
+    def persistir_datos(self) -> None:
+        """
+        Vuelca a disco los contactos pendientes y registra sus URLs como vistas.
+        
+        Las URLs solo se marcan como vistas para siguientes ejecuciones una vez que
+        sus contactos están en disco; si el proceso muere antes, se vuelven a extraer.
+        Todo punto de control activo se escribe después de recoger las extracciones
+        en curso y llamar a este método (guardar_progreso y
+        guardar_punto_control_actual), para que lo guardado coincida con el progreso.
+        """
+        self.gestor_datos.volcar_pendientes()
+        if self._urls_extraidas:
+            registrar_urls_vistas(self._urls_extraidas)
+            self._urls_extraidas = []
+    
+    def cerrar(self):
+        """Guarda los datos pendientes y libera los recursos de extracción y la sesión HTTP."""
+        self.persistir_datos()
+        self.extractor.cerrar()
+        self.buscador.cerrar()
+        self.sesion.close()
+    
+    def guardar_contador(self, forzar: bool = False) -> None:
+        """
+        Persiste el contador diario de búsquedas cada `contador_cada` búsquedas.
+        
+        Args:
+            forzar: Guardar aunque no se haya completado el lote (puntos de control, errores, fin)
+        """
+        if not self.fecha_contador or self.contador_busquedas == self._contador_guardado:
+            return
+        if forzar or self.contador_busquedas - self._contador_guardado >= self.contador_cada:
+            actualizar_contador_busquedas(self.contador_busquedas, self.fecha_contador)
+            self._contador_guardado = self.contador_busquedas
+    
+    def recoger_pendientes(self) -> None:
+        """Espera a las extracciones en curso y almacena sus contactos."""
+        pendientes, self.pendientes = self.pendientes, []
+        if pendientes:
+            contactos = [futuro.result() for futuro in pendientes]
+            self.gestor_datos.agregar_multiples_contactos(contactos)
+            # Solo las extracciones completadas (marcadas con fecha por el extractor)
+            # cuentan como vistas: robots.txt, errores HTTP y timeouts se reintentan
+            # en la siguiente ejecución
+            self._urls_extraidas.extend(
+                normalizar_url(contacto['url']) for contacto in contactos if 'fecha_extraccion' in contacto
+            )
+    
+    def construir_plan(self, keywords: Sequence[str], comunidades: Sequence[str],
+                       ciudades: Dict[str, List[str]], omitir: Optional[Set[str]] = None) -> List[PasoBusqueda]:
+        """
+        Genera la secuencia completa de búsquedas en el orden en que se ejecutan.
+        
+        Para cada comunidad se buscan primero todas las keywords a nivel de
+        comunidad y después las de cada una de sus ciudades.
+        
+        Args:
+            keywords: Palabras clave de búsqueda
+            comunidades: Comunidades autónomas
+            ciudades: Ciudades de cada comunidad
+            omitir: Comunidades ya completadas, que no se incluyen en el plan
+            
+        Returns:
+            Lista de pasos de búsqueda
+        """
+        omitir = omitir or set()
+        plan = []
+        for comunidad_idx, comunidad in enumerate(comunidades):
+            if comunidad in omitir:
+                self.logger.info("Saltando comunidad ya procesada: %s", comunidad)
+                continue
+            plan.extend(PasoBusqueda(comunidad_idx, False, 0, keyword_idx, comunidad, "", keyword)
+                        for keyword_idx, keyword in enumerate(keywords))
+            for ciudad_idx, ciudad in enumerate(ciudades.get(comunidad, [])):
+                plan.extend(PasoBusqueda(comunidad_idx, True, ciudad_idx, keyword_idx, comunidad, ciudad, keyword)
+                            for keyword_idx, keyword in enumerate(keywords))
+        return plan
+    
+    def guardar_progreso(self, paso: PasoBusqueda) -> None:
+        """
+        Guarda un punto de control para reanudar la búsqueda desde un paso del plan.
+        
+        Args:
+            paso: Próximo paso de búsqueda a ejecutar
+        """
+        self.recoger_pendientes()
+        self.persistir_datos()
+        self.guardar_contador(forzar=True)
+        guardar_punto_control(PuntoControl(
+            activo=True,
+            comunidad_actual=paso.comunidad,
+            comunidad_idx=paso.comunidad_idx,
+            keyword_actual=paso.keyword,
+            keyword_idx=paso.keyword_idx,
+            ciudad_actual=paso.ciudad,
+            ciudad_idx=paso.ciudad_idx,
+            en_ciudad=paso.en_ciudad,
+            comunidades_completadas=list(self.comunidades_completadas)
+        ))
+    
+    def guardar_punto_control_actual(self) -> None:
+        """
+        Guarda un punto de control con el progreso actual al interrumpir la búsqueda.
+        
+        Antes recoge y vuelca el lote que aún se esté extrayendo; si falla, el
+        punto de control se guarda igualmente con lo que sí se pudo recoger.
+        """
+        try:
+            self.recoger_pendientes()
+            self.persistir_datos()
+        except Exception as e:
+            self.logger.error("Error al recoger extracciones pendientes: %s", e)
+        
+        self.guardar_contador(forzar=True)
+        guardar_punto_control(self.punto_control_actual())
+    
+    def punto_control_actual(self) -> PuntoControl:
+        """
+        Construye un punto de control con el estado de progreso actual.
+        
+        Returns:
+            Punto de control activo en la búsqueda en curso
+        """
+        return PuntoControl(
+            activo=True,
+            comunidad_actual=self.comunidad_actual,
+            comunidad_idx=self.comunidad_idx,
+            keyword_actual=self.keyword_actual,
+            keyword_idx=self.keyword_idx,
+            ciudad_actual=self.ciudad_actual,
+            ciudad_idx=self.ciudad_idx,
+            en_ciudad=self.en_ciudad,
+            comunidades_completadas=list(self.comunidades_completadas)
+        )
+    
     def ejecutar_busqueda(self):
         """
         Ejecuta el proceso completo de búsqueda y extracción con soporte para continuar
         desde el último punto de control si se alcanzó el límite diario.
         """
         # Extraer parámetros de configuración
-        keywords = self.config['keywords']
+        keywords = tuple(self.config['keywords'])
         comunidades = self.config['regiones']['comunidades']
         ciudades = self.config['regiones']['ciudades']
         
         # Obtener el límite de búsquedas diarias
         limite_busquedas = self.config.get('limite_busquedas_diarias', 95)
-        self.logger.info(f"Límite de búsquedas diarias configurado a: {limite_busquedas}")
+        
+        # Referencias locales para el bucle de búsqueda (evita búsquedas de atributos en cada iteración)
+        log_info = self.logger.info
+        info_enabled = self.logger.isEnabledFor(logging.INFO)
+        buscar = self.buscador.buscar
+        buscar_en_cache = self.buscador.buscar_en_cache
+        filtrar = self.filtrar_urls_nuevas
+        enviar_lote = self.extractor.enviar_lote
+        recoger = self.recoger_pendientes
+        
+        # Cada cuántas búsquedas se guarda un punto de control intermedio
+        checkpoint_cada = self.config.get('guardado', {}).get('checkpoint_cada', 10)
+        busquedas_sesion = 0
+        
+        self.logger.info("Límite de búsquedas diarias configurado a: %d", limite_busquedas)
         
         # Inicializar contador de búsquedas persistente
         contador_busquedas, fecha_actual = gestionar_contador_busquedas()
-        self.logger.info(f"Estado actual: {contador_busquedas}/{limite_busquedas} búsquedas realizadas hoy ({fecha_actual})")
+        self.contador_busquedas = self._contador_guardado = contador_busquedas
+        self.fecha_contador = fecha_actual
+        self.logger.info("Estado actual: %d/%d búsquedas realizadas hoy (%s)",
+                         contador_busquedas, limite_busquedas, fecha_actual)
         
         # Cargar punto de control si existe
         checkpoint = cargar_punto_control()
         
-        # Determinar índices de inicio basados en el checkpoint
-        comunidad_inicio_idx = checkpoint["comunidad_idx"] if checkpoint["activo"] else 0
-        keyword_inicio_idx = checkpoint["keyword_idx"] if checkpoint["activo"] else 0
+        # Determinar índices de inicio basados en el checkpoint (uno inactivo vale todo 0)
+        comunidad_inicio_idx = checkpoint.comunidad_idx
+        keyword_inicio_idx = checkpoint.keyword_idx
         
         # Verificar si comenzamos desde una ciudad
-        en_ciudad = checkpoint["en_ciudad"] if checkpoint["activo"] else False
-        ciudad_inicio_idx = checkpoint["ciudad_idx"] if checkpoint["activo"] else 0
+        en_ciudad = checkpoint.en_ciudad
+        ciudad_inicio_idx = checkpoint.ciudad_idx
         
         # Marcar comunidades ya completadas
-        self.comunidades_completadas = set(checkpoint["comunidades_completadas"]) if checkpoint["activo"] else set()
+        self.comunidades_completadas = set(checkpoint.comunidades_completadas)
         
-        if checkpoint["activo"]:
-            self.logger.info(f"Continuando desde el último punto de control: " 
-                           f"Comunidad {checkpoint['comunidad_actual']}, "
-                           f"Keyword {checkpoint['keyword_actual']}")
+        if checkpoint.activo:
+            self.logger.info("Continuando desde el último punto de control: Comunidad %s, Keyword %s",
+                             checkpoint.comunidad_actual, checkpoint.keyword_actual)
             if en_ciudad:
-                self.logger.info(f"Continuando en ciudad: {checkpoint['ciudad_actual']}")
+                self.logger.info("Continuando en ciudad: %s", checkpoint.ciudad_actual)
         
         # Actualizar estado
         self.actualizar_estado(
-            comunidad=checkpoint["comunidad_actual"],
+            comunidad=checkpoint.comunidad_actual,
             comunidad_idx=comunidad_inicio_idx,
-            keyword=checkpoint["keyword_actual"],
+            keyword=checkpoint.keyword_actual,
             keyword_idx=keyword_inicio_idx,
-            ciudad=checkpoint["ciudad_actual"],
+            ciudad=checkpoint.ciudad_actual,
             ciudad_idx=ciudad_inicio_idx,
             en_ciudad=en_ciudad
         )
         
         # Verificar si ya se alcanzó el límite antes de empezar
         if contador_busquedas >= limite_busquedas:
-            self.logger.warning(f"Ya se ha alcanzado el límite diario de {limite_busquedas} búsquedas. No se realizarán más búsquedas hoy.")
+            self.logger.warning("Ya se ha alcanzado el límite diario de %d búsquedas. No se realizarán más búsquedas hoy.", limite_busquedas)
             
             # Guardar resultados y mostrar estadísticas
             self.gestor_datos.guardar_resultados()
             stats = self.gestor_datos.obtener_estadisticas()
             stats['busquedas_realizadas'] = contador_busquedas
             stats['limite_busquedas'] = limite_busquedas
+            stats['dominios_visitados'] = len(self.limitador.peticiones)
             
             return stats
         
-        # 1. Búsqueda a nivel de Comunidad Autónoma
-        for comunidad_idx, comunidad in enumerate(comunidades[comunidad_inicio_idx:], start=comunidad_inicio_idx):
-            # Actualizar estado
-            self.actualizar_estado(comunidad=comunidad, comunidad_idx=comunidad_idx)
+        # Plan completo de búsquedas; se reanuda desde el primer paso no ejecutado
+        # (las comunidades completadas se excluyen ya al construirlo)
+        plan = self.construir_plan(keywords, comunidades, ciudades, omitir=self.comunidades_completadas)
+        punto = (comunidad_inicio_idx, en_ciudad, ciudad_inicio_idx, keyword_inicio_idx)
+        inicio = next((i for i, paso in enumerate(plan) if paso[:4] >= punto), len(plan))
+        
+        # Indica que la ejecución se detuvo antes de terminar el plan y debe reanudarse
+        reanudar = False
+        zona_anterior = None
+        
+        for posicion in range(inicio, len(plan)):
+            paso = plan[posicion]
+            comunidad, ciudad, keyword = paso.comunidad, paso.ciudad, paso.keyword
             
-            # Saltar comunidades completadas
-            if comunidad in self.comunidades_completadas:
-                self.logger.info(f"Saltando comunidad ya procesada: {comunidad}")
-                continue
-                
-            self.logger.info(f"Iniciando búsqueda en la Comunidad: {comunidad}")
+            # Actualizar estado (asignación directa: todos los campos cambian a la vez)
+            self.comunidad_actual, self.comunidad_idx = comunidad, paso.comunidad_idx
+            self.keyword_actual, self.keyword_idx = keyword, paso.keyword_idx
+            self.ciudad_actual, self.ciudad_idx, self.en_ciudad = ciudad, paso.ciudad_idx, paso.en_ciudad
             
-            # Para la primera comunidad, usar keyword_inicio_idx, para el resto empezar desde 0
-            k_inicio = keyword_inicio_idx if comunidad_idx == comunidad_inicio_idx else 0
+            zona = ciudad or comunidad
+            if info_enabled and zona != zona_anterior:
+                if ciudad:
+                    log_info("Buscando en ciudad: %s (%s)", ciudad, comunidad)
+                else:
+                    log_info("Iniciando búsqueda en la Comunidad: %s", comunidad)
+            zona_anterior = zona
             
-            for keyword_idx, keyword in enumerate(keywords[k_inicio:], start=k_inicio):
-                # Actualizar estado
-                self.actualizar_estado(keyword=keyword, keyword_idx=keyword_idx)
-                
-                # Verificar límite de búsquedas
+            # Una búsqueda repetida recientemente se sirve desde la caché sin gastar cupo
+            resultados = buscar_en_cache(keyword, zona)
+            if resultados is None:
+                # Verificar límite de búsquedas; el punto de control apunta a este paso
                 if contador_busquedas >= limite_busquedas:
-                    self.logger.warning(f"Se ha alcanzado el límite diario de {limite_busquedas} búsquedas. Guardando punto de control.")
-                    
-                    # Guardar punto de control para continuar mañana
-                    checkpoint_data = {
-                        "activo": True,
-                        "comunidad_actual": comunidad,
-                        "comunidad_idx": comunidad_idx,
-                        "keyword_actual": keyword,
-                        "keyword_idx": keyword_idx,
-                        "ciudad_actual": "",
-                        "ciudad_idx": 0,
-                        "en_ciudad": False,
-                        "comunidades_completadas": list(self.comunidades_completadas),
-                        "fecha_checkpoint": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    }
-                    guardar_punto_control(checkpoint_data)
+                    self.logger.warning("Se ha alcanzado el límite diario de %d búsquedas. Guardando punto de control.", limite_busquedas)
+                    self.guardar_progreso(paso)
+                    reanudar = True
                     break
                 
-                contador_busquedas += 1
-                self.logger.info(f"Buscando '{keyword}' en '{comunidad}' - Búsquedas: {contador_busquedas}/{limite_busquedas}")
+                if info_enabled:
+                    log_info("Buscando '%s' en '%s' - Búsquedas: %d/%d", keyword, zona, contador_busquedas + 1, limite_busquedas)
                 
-                # Obtener URLs y procesar resultados
-                urls = self.buscador.buscar(keyword, comunidad)
-                for url in urls:
-                    contacto = self.extractor.extraer_informacion(
-                        url=url,
-                        zona=comunidad,
-                        tipo_zona='comunidad',
-                        keyword=keyword
-                    )
-                    self.gestor_datos.agregar_contacto(contacto)
+                # Obtener URLs; un fallo transitorio (tras los reintentos) no consume cupo
+                # y se repite en la próxima ejecución. Un fallo permanente de la consulta
+                # llega como lista vacía y el plan sigue con el paso siguiente
+                resultados = buscar(keyword, zona)
+                if resultados is None:
+                    self.logger.warning("La búsqueda de '%s' en '%s' ha fallado. Guardando punto de control.", keyword, zona)
+                    self.guardar_progreso(paso)
+                    reanudar = True
+                    break
+                contador_busquedas += 1
                 
-                # Actualizar el contador persistente después de cada búsqueda
-                actualizar_contador_busquedas(contador_busquedas, fecha_actual)
+                # Actualizar el contador (se escribe a disco por lotes)
+                self.contador_busquedas = contador_busquedas
+                self.guardar_contador()
             
-            # Verificar si llegamos al límite
-            if contador_busquedas >= limite_busquedas:
-                break
-                
-            # 2. Búsqueda específica en ciudades de la comunidad
-            if comunidad in ciudades:
-                # Si estamos continuando en una comunidad específica y se marcó para continuar en ciudad
-                c_inicio = ciudad_inicio_idx if (comunidad_idx == comunidad_inicio_idx and en_ciudad) else 0
-                
-                for ciudad_idx, ciudad in enumerate(ciudades[comunidad][c_inicio:], start=c_inicio):
-                    # Actualizar estado
-                    self.actualizar_estado(ciudad=ciudad, ciudad_idx=ciudad_idx, en_ciudad=True)
-                    
-                    self.logger.info(f"Buscando en ciudad: {ciudad} ({comunidad})")
-                    
-                    # Para la primera ciudad cuando se continúa, usar keyword_inicio_idx
-                    kw_inicio = keyword_inicio_idx if (comunidad_idx == comunidad_inicio_idx and 
-                                                   ciudad_idx == c_inicio and en_ciudad) else 0
-                    
-                    for keyword_idx, keyword in enumerate(keywords[kw_inicio:], start=kw_inicio):
-                        # Actualizar estado
-                        self.actualizar_estado(keyword=keyword, keyword_idx=keyword_idx)
-                        
-                        # Verificar límite de búsquedas
-                        if contador_busquedas >= limite_busquedas:
-                            # Guardar punto de control para continuar en esta ciudad
-                            checkpoint_data = {
-                                "activo": True,
-                                "comunidad_actual": comunidad,
-                                "comunidad_idx": comunidad_idx,
-                                "keyword_actual": keyword,
-                                "keyword_idx": keyword_idx,
-                                "ciudad_actual": ciudad,
-                                "ciudad_idx": ciudad_idx,
-                                "en_ciudad": True,
-                                "comunidades_completadas": list(self.comunidades_completadas),
-                                "fecha_checkpoint": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                            }
-                            guardar_punto_control(checkpoint_data)
-                            break
-                        
-                        contador_busquedas += 1
-                        self.logger.info(f"Buscando '{keyword}' en '{ciudad}' - Búsquedas: {contador_busquedas}/{limite_busquedas}")
-                        
-                        # Proceso de búsqueda y extracción
-                        urls = self.buscador.buscar(keyword, ciudad)
-                        for url in urls:
-                            contacto = self.extractor.extraer_informacion(
-                                url=url,
-                                zona=ciudad,
-                                tipo_zona='ciudad',
-                                keyword=keyword
-                            )
-                            self.gestor_datos.agregar_contacto(contacto)
-                        
-                        # Actualizar contador persistente
-                        actualizar_contador_busquedas(contador_busquedas, fecha_actual)
-                    
-                    # Verificar límite después de cada ciudad
-                    if contador_busquedas >= limite_busquedas:
-                        break
-                
-                # Verificar límite después de todas las ciudades de la comunidad
-                if contador_busquedas >= limite_busquedas:
-                    break
+            # Lanzar la extracción; el lote anterior se ha estado descargando
+            # mientras se esperaba a la API de búsqueda
+            urls = filtrar(resultados)
+            recoger()
+            self.pendientes = enviar_lote(urls, zona, 'ciudad' if ciudad else 'comunidad', keyword)
             
-            # Marcar esta comunidad como completada
-            self.comunidades_completadas.add(comunidad)
+            busquedas_sesion += 1
             
-            # Actualizar checkpoint para indicar que esta comunidad está completada
-            checkpoint_data = {
-                "activo": True,
-                "comunidad_actual": "",
-                "comunidad_idx": comunidad_idx + 1,  # La próxima comunidad
-                "keyword_actual": "",
-                "keyword_idx": 0,
-                "ciudad_actual": "",
-                "ciudad_idx": 0,
-                "en_ciudad": False,
-                "comunidades_completadas": list(self.comunidades_completadas),
-                "fecha_checkpoint": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            guardar_punto_control(checkpoint_data)
+            siguiente = plan[posicion + 1] if posicion + 1 < len(plan) else None
+            if siguiente is None or siguiente.comunidad_idx != paso.comunidad_idx:
+                # Último paso de la comunidad: marcarla como completada
+                self.comunidades_completadas.add(comunidad)
+                if siguiente is not None:
+                    self.guardar_progreso(siguiente)
+            elif checkpoint_cada > 0 and busquedas_sesion % checkpoint_cada == 0:
+                # Punto de control periódico apuntando al siguiente paso
+                # (checkpoint_cada <= 0: solo al cerrar comunidad o al salir)
+                self.guardar_progreso(siguiente)
+        
+        recoger()
+        self.guardar_contador(forzar=True)
         
         # Al finalizar todas las comunidades, resetear el checkpoint
-        checkpoint_data = {
-            "activo": False,
-            "comunidad_actual": "",
-            "comunidad_idx": 0,
-            "keyword_actual": "",
-            "keyword_idx": 0,
-            "ciudad_actual": "",
-            "ciudad_idx": 0,
-            "en_ciudad": False,
-            "comunidades_completadas": [],
-            "fecha_checkpoint": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        guardar_punto_control(checkpoint_data)
+        if not reanudar:
+            guardar_punto_control(PuntoControl())
         
         # Guardar resultados finales
         self.gestor_datos.guardar_resultados()
@@ -303,15 +454,21 @@ class Prospector:
         stats = self.gestor_datos.obtener_estadisticas()
         stats['busquedas_realizadas'] = contador_busquedas
         stats['limite_busquedas'] = limite_busquedas
+        stats['dominios_visitados'] = len(self.limitador.peticiones)
         
         return stats
 
-def main():
-    """Función principal para ejecutar el script."""
+def main(sector: Optional[str] = None):
+    """
+    Función principal para ejecutar el script.
+    
+    Args:
+        sector: Sector de búsqueda a usar (por defecto, el 'sector_activo' configurado)
+    """
     prospector = None
     try:
         # Crear y ejecutar el prospector
-        prospector = Prospector()
+        prospector = Prospector(sector=sector)
         stats = prospector.ejecutar_busqueda()
         
         # Mostrar resumen en consola
@@ -320,30 +477,20 @@ def main():
         print(f"Contactos con email: {stats['con_email']}")
         print(f"Contactos con teléfono: {stats['con_telefono']}")
         print(f"Búsquedas realizadas: {stats['busquedas_realizadas']}/{stats['limite_busquedas']}")
+        print(f"Dominios visitados: {stats['dominios_visitados']}")
         
     except KeyboardInterrupt:
         print("\nProceso interrumpido por el usuario")
         if prospector is not None:
             print("Guardando punto de control y resultados...")
             
+            # Recoger el lote en curso, guardar contador y punto de control: si el
+            # lote se descartara, al reanudar no se volvería a buscar
+            prospector.guardar_punto_control_actual()
+            
             # Guardar resultados
             prospector.gestor_datos.guardar_resultados()
             
-            # Guardar punto de control
-            checkpoint_data = {
-                "activo": True,
-                "comunidad_actual": prospector.comunidad_actual,
-                "comunidad_idx": prospector.comunidad_idx,
-                "keyword_actual": prospector.keyword_actual,
-                "keyword_idx": prospector.keyword_idx,
-                "ciudad_actual": prospector.ciudad_actual,
-                "ciudad_idx": prospector.ciudad_idx,
-                "en_ciudad": prospector.en_ciudad,
-                "comunidades_completadas": list(prospector.comunidades_completadas),
-                "fecha_checkpoint": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            guardar_punto_control(checkpoint_data)
-            
             # Mostrar estadísticas
             try:
                 stats = prospector.gestor_datos.obtener_estadisticas()
@@ -358,25 +505,44 @@ def main():
         if prospector is not None:
             try:
                 print("Guardando resultados parciales y punto de control...")
+                prospector.guardar_punto_control_actual()
                 prospector.gestor_datos.guardar_resultados()
-                
-                # Guardar punto de control
-                checkpoint_data = {
-                    "activo": True,
-                    "comunidad_actual": prospector.comunidad_actual,
-                    "comunidad_idx": prospector.comunidad_idx,
-                    "keyword_actual": prospector.keyword_actual,
-                    "keyword_idx": prospector.keyword_idx,
-                    "ciudad_actual": prospector.ciudad_actual,
-                    "ciudad_idx": prospector.ciudad_idx,
-                    "en_ciudad": prospector.en_ciudad,
-                    "comunidades_completadas": list(prospector.comunidades_completadas),
-                    "fecha_checkpoint": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }
-                guardar_punto_control(checkpoint_data)
             except Exception as ex:
                 print(f"Error al guardar progreso: {str(ex)}")
         sys.exit(1)
+    finally:
+        if prospector is not None:
+            prospector.cerrar()
+
+def parsear_argumentos(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Interpreta los argumentos de línea de comandos.
+    
+    Args:
+        argv: Argumentos a interpretar (por defecto, los de sys.argv)
+        
+    Returns:
+        Argumentos interpretados
+    """
+    parser = argparse.ArgumentParser(description="Prospección de negocios con Google Custom Search y scraping de contactos.")
+    parser.add_argument('--version', action='version', version=f"%(prog)s {__version__}")
+    parser.add_argument('--sector', help="Sector de config/filtros_busqueda.json a usar (por defecto, 'sector_activo')")
+    parser.add_argument('--list-config', action='store_true',
+                        help="Muestra la configuración cargada (sin la clave de API) y termina")
+    return parser.parse_args(argv)
+
+def mostrar_configuracion() -> None:
+    """Imprime la configuración efectiva ocultando la clave de API."""
+    import json
+    
+    config = cargar_configuracion()
+    if config.get('google_api', {}).get('api_key'):
+        config['google_api'] = dict(config['google_api'], api_key='***')
+    print(json.dumps(config, ensure_ascii=False, indent=4))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parsear_argumentos()
+    if args.list_config:
+        mostrar_configuracion()
+    else:
+        main(sector=args.sector)
\ No newline at end of file
@@ -1,9 +1,18 @@
-import requests
+import os
 import time
 import random
+import shelve
+import hashlib
 import logging
-from urllib.parse import quote
-from typing import List, Dict, Any
+import requests
+from itertools import islice
+from urllib.parse import quote, quote_plus
+from typing import List, Dict, Any, Optional
+
+# Errores HTTP del cliente que no dependen de la consulta: credenciales o cupo (401,
+# 403), timeout (408) y límite de ritmo (429). Con ellos se detiene la ejecución y el
+# mismo paso se repite más tarde; el resto de 4xx se da por fallo de esa consulta
+ESTADOS_DETENER = frozenset({401, 403, 408, 429})
 
 class GoogleBuscador:
     """
@@ -11,23 +20,48 @@ class GoogleBuscador:
     Reemplaza las búsquedas con Selenium para mayor eficiencia y cumplimiento.
     """
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], sesion: Optional[requests.Session] = None):
         """
         Inicializa el buscador con la configuración necesaria.
         
         Args:
             config: Configuración que incluye claves API y parámetros.
+            sesion: Sesión HTTP compartida (se crea una propia si no se indica)
         """
+        self.sesion = sesion or requests.Session()
         self.api_key = config['google_api']['api_key']
         self.cx_id = config['google_api']['cx_id']
         self.resultados_max = config['google_api']['resultados_por_busqueda']
         self.delay_range = config['delays']['entre_busquedas']
+        # Instante (reloj monotónico) a partir del cual se permite la siguiente llamada a la API
+        self._proxima_busqueda = 0.0
         self.logger = logging.getLogger('Buscador')
         self.base_url = "https://customsearch.googleapis.com/customsearch/v1"
+        # Parámetros constantes ya codificados; en cada búsqueda solo se codifica la query
+        self._url_busqueda = (f"{self.base_url}?key={quote(self.api_key)}&cx={quote(self.cx_id)}"
+                              f"&num=10&q=")  # num=10: máximo permitido por la API
+        
+        # Caché persistente de resultados por consulta (evita gastar cupo repitiendo búsquedas)
+        self.cache_ttl = config['google_api'].get('cache_dias', 7) * 86400
+        self.cache = None
+        if self.cache_ttl > 0:
+            os.makedirs('results', exist_ok=True)
+            self.cache = shelve.open(os.path.join('results', 'cache_busquedas'))
         
         # Cargar configuración de filtros si existe
         self.filtros = config.get('filtros_busqueda', {})
         self.sector_activo = self.filtros.get('sector_activo', 'default')
+        
+        # Los términos del sector no cambian durante la ejecución: se preparan una sola vez
+        filtros = self._obtener_filtros_sector()
+        
+        # Términos de inclusión (al menos uno debe estar presente)
+        inclusion_terms = filtros['inclusiones']
+        self._inclusion_query = f"({' OR '.join(inclusion_terms)})" if inclusion_terms else ""
+        
+        # Términos de exclusión (ninguno debe estar presente)
+        exclusion_terms = filtros['exclusiones']
+        self._exclusion_query = " ".join([f"-{term}" for term in exclusion_terms]) if exclusion_terms else ""
     
     def _obtener_filtros_sector(self) -> Dict[str, List[str]]:
         """
@@ -38,7 +72,7 @@ class GoogleBuscador:
         """
         sectores = self.filtros.get('sectores', {})
         if self.sector_activo not in sectores:
-            self.logger.warning(f"Sector '{self.sector_activo}' no encontrado, usando default")
+            self.logger.warning("Sector '%s' no encontrado, usando default", self.sector_activo)
             sector_config = sectores.get('default', {})
         else:
             sector_config = sectores.get(self.sector_activo, {})
@@ -59,27 +93,61 @@ class GoogleBuscador:
         Returns:
             Consulta optimizada para la API de Google
         """
-        filtros = self._obtener_filtros_sector()
+        # Construir consulta final con los términos del sector precalculados
+        query_parts = [keyword, region, self._inclusion_query, self._exclusion_query, "contacto site:.es"]
+        query = " ".join(filter(None, query_parts))
         
-        # Términos de inclusión (al menos uno debe estar presente)
-        inclusion_terms = filtros['inclusiones']
-        if inclusion_terms:
-            inclusion_query = " OR ".join(inclusion_terms)
-            inclusion_query = f"({inclusion_query})"
-        else:
-            inclusion_query = ""
+        return query
+    
+    def _esperar_turno(self) -> None:
+        """
+        Respeta el intervalo mínimo entre llamadas a la API.
         
-        # Términos de exclusión (ninguno debe estar presente)
-        exclusion_terms = filtros['exclusiones']
-        exclusion_query = " ".join([f"-{term}" for term in exclusion_terms]) if exclusion_terms else ""
+        El intervalo se cuenta desde la llamada anterior, así que el tiempo que el
+        programa dedica a otras tareas entre búsquedas (p. ej. recoger extracciones)
+        ya no se suma a la espera.
+        """
+        espera = self._proxima_busqueda - time.monotonic()
+        if espera > 0:
+            time.sleep(espera)
+        self._proxima_busqueda = time.monotonic() + random.uniform(self.delay_range[0], self.delay_range[1])
+    
+    def _clave_cache(self, query: str) -> str:
+        """Clave de la caché para una consulta (la query ya incluye los términos del sector)."""
+        return hashlib.blake2b(query.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def buscar_en_cache(self, keyword: str, region: str) -> Optional[List[str]]:
+        """
+        Devuelve los resultados guardados de una búsqueda reciente, sin llamar a la API.
         
-        # Construir consulta final
-        query_parts = [keyword, region, inclusion_query, exclusion_query, "contacto site:.es"]
-        query = " ".join(filter(None, query_parts))
+        Args:
+            keyword: Palabra clave de búsqueda
+            region: Región geográfica (comunidad o ciudad)
+            
+        Returns:
+            Lista de URLs si la consulta está en caché y no ha caducado, None en caso contrario
+        """
+        if self.cache is None:
+            return None
         
-        return query
+        entrada = self.cache.get(self._clave_cache(self._construir_query_optimizada(keyword, region)))
+        if entrada is None:
+            return None
+        
+        fecha, urls = entrada
+        if time.time() - fecha > self.cache_ttl:
+            return None
+        
+        self.logger.info("Resultados en caché para '%s' en '%s' (%d URLs)", keyword, region, len(urls))
+        return urls
+    
+    def cerrar(self) -> None:
+        """Cierra la caché de búsquedas."""
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
     
-    def buscar(self, keyword: str, region: str) -> List[str]:
+    def buscar(self, keyword: str, region: str) -> Optional[List[str]]:
         """
         Realiza una búsqueda en Google combinando keyword y región.
         
@@ -88,41 +156,46 @@ class GoogleBuscador:
             region: Región geográfica (comunidad o ciudad)
             
         Returns:
-            Lista de URLs de resultados
+            Lista de URLs de resultados; lista vacía si la consulta falló de forma
+            permanente (4xx propio de la consulta o respuesta ilegible), o None si
+            el fallo es transitorio (timeout, conexión, 5xx, cupo) y debe repetirse
         """
         query = self._construir_query_optimizada(keyword, region)
-        self.logger.info(f"Buscando: '{query}'")
-        
-        params = {
-            "key": self.api_key,
-            "cx": self.cx_id,
-            "q": query,
-            "num": 10  # Máximo permitido por la API
-        }
+        self.logger.info("Buscando: '%s'", query)
         
         try:
-            response = requests.get(self.base_url, params=params)
+            self._esperar_turno()
+            # Timeout (conexión, lectura): sin él una conexión colgada bloquea toda la ejecución
+            response = self.sesion.get(self._url_busqueda + quote_plus(query), timeout=(3, 10))
             response.raise_for_status()
             
             data = response.json()
-            urls = []
-            
-            if 'items' in data:
-                for item in data['items']:
-                    if len(urls) >= self.resultados_max:
-                        break
-                    urls.append(item['link'])
+            # Los elementos sin enlace (resultados atípicos) se ignoran
+            enlaces = (item.get('link') for item in data.get('items') or [])
+            urls = list(islice(filter(None, enlaces), self.resultados_max))
                 
-            self.logger.info(f"Encontrados {len(urls)} resultados para '{keyword}' en '{region}'")
+            self.logger.info("Encontrados %d resultados para '%s' en '%s'", len(urls), keyword, region)
             
-            # Delay para evitar sobrecargar la API
-            time.sleep(random.uniform(self.delay_range[0], self.delay_range[1]))
+            if self.cache is not None:
+                self.cache[self._clave_cache(query)] = (time.time(), urls)
             
             return urls
         
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"Error en la búsqueda de Google para '{keyword}' en '{region}': {str(e)}")
+        except requests.exceptions.HTTPError as e:
+            estado = e.response.status_code if e.response is not None else 0
+            if 400 <= estado < 500 and estado not in ESTADOS_DETENER:
+                # Repetir la consulta en otra ejecución volvería a fallar: se omite
+                self.logger.error("Consulta rechazada (%d) para '%s' en '%s', se omite: %s",
+                                  estado, keyword, region, e)
+                return []
+            self.logger.error("Error en la búsqueda de Google para '%s' en '%s': %s", keyword, region, e)
+            return None
+        except requests.exceptions.JSONDecodeError as e:
+            self.logger.error("Respuesta ilegible de la búsqueda para '%s' en '%s', se omite: %s", keyword, region, e)
             return []
+        except requests.exceptions.RequestException as e:
+            self.logger.error("Error en la búsqueda de Google para '%s' en '%s': %s", keyword, region, e)
+            return None
         except Exception as e:
-            self.logger.error(f"Error inesperado en búsqueda: {str(e)}")
+            self.logger.error("Error inesperado en búsqueda para '%s' en '%s', se omite: %s", keyword, region, e)
             return []
\ No newline at end of file
@@ -1,32 +1,150 @@
 import re
 import time
+import queue
 import random
 import logging
+import logging.handlers
+import threading
+import multiprocessing
 import requests
-from typing import Dict, Any, Optional, Union
-from bs4 import BeautifulSoup
-from urllib.parse import quote
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from html import unescape
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import quote, unquote, urlsplit
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from urllib.robotparser import RobotFileParser
+from modules.utils import crear_sesion_http
+
+# Patrones de regex para email y teléfono, compilados una sola vez al importar el módulo.
+# El lookbehind impide empezar un intento en mitad de una secuencia de caracteres válidos
+# (blobs base64, JS minificado), que de otro modo se reexplora desde cada posición; los
+# límites finales evitan además tomar 9 dígitos de dentro de números más largos.
+# La parte local es posesiva (Python 3.11+): como '@' no pertenece a su clase, ceder
+# caracteres nunca puede producir una coincidencia y se evita el backtracking. El
+# dominio no puede serlo, porque necesita retroceder hasta el último punto.
+EMAIL_RE = re.compile(r'(?<![a-zA-Z0-9._%+-])[a-zA-Z0-9._%+-]++@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b', re.ASCII)
+# El teléfono usa una sola rama: con los separadores opcionales ya cubre también los
+# 9 dígitos seguidos, y \d en ASCII no acepta dígitos Unicode que no se normalizarían.
+PHONE_RE = re.compile(r'(?<![\d+])(?:\+34|34)?[ -]?[6789](?:[ -]?\d{2}){4}(?!\d)', re.ASCII)
+
+# Patrones auxiliares de validación y normalización
+# Números de versión en el usuario (1.2.3 o v2), típicos de referencias a bibliotecas
+VERSION_RE = re.compile(r'\d+\.\d+\.\d+|v\d+')
+TELEFONO_ES_RE = re.compile(r'\+34[6789]\d{8}')
+# Extensiones de archivos de recursos: nombres como logo@2x.png (imágenes retina de
+# temas WordPress) tienen forma de email, pero su "TLD" es la extensión del archivo
+EXTENSIONES_RECURSO = frozenset({'png', 'jpg', 'jpeg', 'gif', 'svg', 'webp', 'ico', 'css', 'js'})
+
+# Tablas de str.translate para limpiar teléfonos en una sola pasada en C: solo
+# dígitos y '+' (los caracteres no ASCII que queden los rechaza TELEFONO_ES_RE) y
+# sin separadores. El texto del enlace de WhatsApp es fijo y se codifica una única vez
+SOLO_DIGITOS = str.maketrans('', '', ''.join(chr(i) for i in range(128) if chr(i) not in '0123456789+'))
+SIN_SEPARADORES = str.maketrans('', '', ' -')
+MENSAJE_WHATSAPP = quote("mensaje a enviar... ")
+
+# Tamaño de los bloques en que se lee el cuerpo de cada página
+BLOQUE_DESCARGA = 65536
+# Caracteres finales de un búfer parcial en los que un email o teléfono podría
+# estar partido por el corte de bloque (mayor que el email más largo aceptado)
+MARGEN_CORTE = 256
+
+# Patrones para analizar el HTML sin construir el árbol: bloques <script>/<style> y
+# comentarios (se descartan antes de buscar contactos) y título de la página
+SCRIPT_STYLE_RE = re.compile(r'<!--.*?-->|<(script|style)\b[^>]*>.*?</\1\s*>', re.DOTALL | re.IGNORECASE)
+TITLE_RE = re.compile(r'<title[^>]*>([^<]+)</title', re.IGNORECASE)
+# Apertura de <script>/<style> que sigue en el texto tras SCRIPT_STYLE_RE (sin cerrar)
+SCRIPT_STYLE_ABIERTO_RE = re.compile(r'<(?:script|style)\b', re.IGNORECASE)
+# Cualquier etiqueta; si es un enlace mailto:/tel:, los grupos 1-3 capturan su destino
+# (entre comillas dobles, simples o sin comillas)
+ETIQUETA_RE = re.compile(
+    r'<[^>]*?\bhref\s*=\s*(?:"\s*(?:mailto|tel):([^"?]*)|\'\s*(?:mailto|tel):([^\'?]*)'
+    r'|(?:mailto|tel):([^\s>?]*))[^>]*>|<[^>]*>',
+    re.IGNORECASE
+)
+
+# Patrones más laxos usados solo para detectar si una página muestra contactos
+EMAIL_SONDEO_RE = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+PHONE_SONDEO_RE = re.compile(r'(?:\+34|34)?[ -]?[6789]\d{2}[ -]?\d{2}[ -]?\d{2}[ -]?\d{2}')
+
+# Segundos que se recuerda un robots.txt que no se pudo descargar antes de reintentarlo,
+# y tiempo máximo de su descarga
+ROBOTS_TTL_ERROR = 600
+ROBOTS_TIMEOUT = 5
+
+class DomainLimiter:
+    """
+    Controla el ritmo de peticiones por dominio.
+    
+    Cada dominio admite como máximo una petición en curso y un retardo aleatorio
+    entre peticiones consecutivas, mientras que dominios distintos se procesan
+    en paralelo sin esperarse entre sí.
+    """
+    
+    def __init__(self, delay_range: Sequence[float]):
+        """
+        Inicializa el limitador.
+        
+        Args:
+            delay_range: Rango [mínimo, máximo] en segundos entre peticiones a un mismo dominio
+        """
+        self.delay_range = delay_range
+        self._lock = threading.Lock()
+        self._locks_dominio: Dict[str, threading.Lock] = {}
+        self._proxima_peticion: Dict[str, float] = {}
+        self.peticiones = Counter()
+    
+    @contextmanager
+    def acquire(self, url: str) -> Iterator[None]:
+        """
+        Reserva el dominio de la URL durante el bloque, esperando si es necesario.
+        
+        Args:
+            url: URL que se va a solicitar
+        """
+        dominio = urlsplit(url).netloc.lower()
+        with self._lock:
+            lock_dominio = self._locks_dominio.setdefault(dominio, threading.Lock())
+            self.peticiones[dominio] += 1
+        
+        with lock_dominio:
+            espera = self._proxima_peticion.get(dominio, 0.0) - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+            try:
+                yield
+            finally:
+                self._proxima_peticion[dominio] = time.monotonic() + random.uniform(
+                    self.delay_range[0], self.delay_range[1]
+                )
+
 
 class BaseExtractor:
     """Clase base para extractores de información de contacto."""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], robots_cache: Optional[Dict[str, Tuple[RobotFileParser, float]]] = None,
+                 sesion: Optional[requests.Session] = None):
         """
         Inicializa el extractor base.
         
         Args:
             config: Configuración del sistema
+            robots_cache: Caché compartida de robots.txt por dominio base (parser y
+                momento de caducidad)
+            sesion: Sesión HTTP compartida (se crea una con el mismo pool y política
+                de reintentos si no se indica)
         """
         self.config = config
         self.logger = logging.getLogger('Extractor')
         self.delay_range = config['delays']['entre_extracciones']
+        self.sesion = sesion or crear_sesion_http(config)
+        self.robots_cache = robots_cache if robots_cache is not None else {}
+        self.robots_ttl = config.get('robots_cache_horas', 6) * 3600
         
         # Lista de dominios comunes de bibliotecas y frameworks para exclusión
         self.exclusion_domains = [
@@ -47,17 +165,18 @@ class BaseExtractor:
             'admin', 'version', 'v1', 'v2', 'v3', 'v4', 'v5', 'spa', 'web',
             'frontend', 'backend', 'api', 'service', 'app', 'module', 'plugin'
         ]
-        
-        # Patrones de regex para email y teléfono
-        self.email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        self.phone_pattern = r'(?:\+34|34)?[ -]?[6789]\d{8}|(?:\+34|34)?[ -]?[6789](?:[ -]?\d{2}){4}'
+        # Una única regex con todos los términos (los más largos primero) sustituye al
+        # bucle de comparaciones por término en validar_email
+        self._exclusion_re = re.compile('|'.join(
+            re.escape(termino) for termino in sorted(set(self.exclusion_domains), key=len, reverse=True)
+        ))
     
     def validar_email(self, email: str) -> bool:
         """
         Valida que un email parezca legítimo y no sea una referencia a biblioteca.
         
         Args:
-            email: Dirección de correo a validar
+            email: Dirección de correo a validar, ya en minúsculas
             
         Returns:
             True si el email parece válido, False en caso contrario
@@ -69,39 +188,98 @@ class BaseExtractor:
         if len(email) < 6 or len(email) > 254:
             return False
         
-        # Extraer el dominio (parte después del @)
-        dominio_parts = email.split('@')
-        if len(dominio_parts) != 2:
+        # Separar usuario y dominio (partition no crea listas intermedias)
+        usuario, _, dominio = email.partition('@')
+        if '@' in dominio:
             return False
-            
-        dominio = dominio_parts[1].lower()
         
         # Verificar si el dominio es un TLD válido
         if '.' not in dominio:
             return False
         
-        # Verificar si es un dominio de biblioteca o framework
-        nombre_dominio = dominio.split('.')[0]
-        for exclusion in self.exclusion_domains:
-            if exclusion == nombre_dominio or exclusion in nombre_dominio:
-                return False
+        # Verificar si es un dominio de biblioteca o framework (coincidencia exacta o subcadena)
+        nombre_dominio = dominio.partition('.')[0]
+        if self._exclusion_re.search(nombre_dominio):
+            return False
         
         # Verificar que el TLD tenga al menos 2 caracteres
-        extension = dominio.split('.')[-1]
-        if len(extension) < 2:
+        extension = dominio.rpartition('.')[2]
+        if len(extension) < 2 or extension in EXTENSIONES_RECURSO:
             return False
         
-        # Verificar si el email tiene números de versión (típico en libs)
-        usuario = dominio_parts[0].lower()
-        if re.search(r'\d+\.\d+\.\d+', usuario) or re.search(r'v\d+', usuario):
-            return False
-            
         # Rechazar emails con nombres de usuario muy cortos (a@dominio.com)
         if len(usuario) < 2:
             return False
+        
+        # Verificar si el email tiene números de versión (típico en libs), en una sola búsqueda
+        if VERSION_RE.search(usuario):
+            return False
             
         return True
     
+    def buscar_email(self, texto: str) -> Optional[str]:
+        """
+        Devuelve el primer email válido del texto.
+        
+        Primera pasada barata con EMAIL_RE (ASCII, recorrida de forma perezosa para
+        parar en el primer email válido); los candidatos fuera de longitud se
+        descartan antes de la validación completa.
+        
+        Args:
+            texto: Texto o HTML en el que buscar
+            
+        Returns:
+            Email en minúsculas, o None si no hay ninguno válido
+        """
+        candidatos = 0
+        for match in EMAIL_RE.finditer(texto):
+            candidatos += 1
+            email = match.group()
+            if not 6 <= len(email) <= 254:
+                continue
+            email_lower = email.lower()
+            if self.validar_email(email_lower):
+                self.logger.info(f"Email válido encontrado: {email_lower}")
+                return email_lower
+            self.logger.debug(f"Email descartado: {email_lower}")
+        
+        if candidatos:
+            self.logger.info(f"Se encontraron {candidatos} posibles emails, pero ninguno pasó la validación")
+        return None
+    
+    def _descargar_robots(self, base_url: str) -> Tuple[RobotFileParser, float]:
+        """
+        Descarga y analiza el robots.txt de un dominio con la sesión compartida.
+        
+        A diferencia de RobotFileParser.read(), que usa urlopen sin timeout, la
+        petición reutiliza el pool de conexiones y tiene un tiempo máximo acotado.
+        Los códigos de respuesta se interpretan igual que en read(): 401/403 y 5xx
+        prohíben todo el sitio y el resto de 4xx lo permiten. Un 5xx suele ser
+        pasajero, así que se recuerda solo durante ROBOTS_TTL_ERROR segundos.
+        
+        Args:
+            base_url: Esquema y host del sitio (p. ej. https://ejemplo.com)
+            
+        Returns:
+            Tupla (parser con las reglas del sitio, segundos que se puede reutilizar)
+            
+        Raises:
+            requests.RequestException: Si la petición falla (conexión, timeout)
+        """
+        rp = RobotFileParser(f"{base_url}/robots.txt")
+        respuesta = self.sesion.get(rp.url, timeout=ROBOTS_TIMEOUT)
+        
+        if respuesta.status_code in (401, 403):
+            rp.disallow_all = True
+        elif 400 <= respuesta.status_code < 500:
+            rp.allow_all = True
+        elif respuesta.status_code >= 500:
+            rp.disallow_all = True
+            return rp, ROBOTS_TTL_ERROR
+        else:
+            rp.parse(respuesta.content.decode('utf-8', errors='replace').splitlines())
+        return rp, self.robots_ttl
+    
     def _verificar_robots_txt(self, url: str) -> bool:
         """
         Verifica si el scraping está permitido según robots.txt.
@@ -114,13 +292,30 @@ class BaseExtractor:
         """
         try:
             # Extraer dominio base
-            parts = url.split('/')
-            base_url = f"{parts[0]}//{parts[2]}"
-            robots_url = f"{base_url}/robots.txt"
+            partes = urlsplit(url)
+            base_url = f"{partes.scheme}://{partes.netloc}"
             
-            rp = RobotFileParser()
-            rp.set_url(robots_url)
-            rp.read()
+            # Reutilizar el robots.txt del dominio mientras no haya caducado. Las
+            # peticiones a un mismo dominio están serializadas por DomainLimiter, así
+            # que no hace falta un lock para evitar descargas duplicadas.
+            ahora = time.monotonic()
+            entrada = self.robots_cache.get(base_url)
+            if entrada is None or entrada[1] <= ahora:
+                try:
+                    rp, ttl = self._descargar_robots(base_url)
+                    expira = ahora + ttl
+                except Exception as e:
+                    # Asumir permitido si no hubo respuesta (conexión, timeout), y
+                    # recordarlo con una caducidad más corta para no reintentar con
+                    # cada URL del mismo dominio
+                    self.logger.warning(f"No se pudo descargar robots.txt de {base_url}: {str(e)}")
+                    rp = RobotFileParser()
+                    rp.allow_all = True
+                    rp.modified()
+                    expira = ahora + ROBOTS_TTL_ERROR
+                self.robots_cache[base_url] = (rp, expira)
+            else:
+                rp = entrada[0]
             
             return rp.can_fetch("*", url)
         except Exception as e:
@@ -135,13 +330,13 @@ class BaseExtractor:
             telefono: Número de teléfono en cualquier formato
             
         Returns:
-            Teléfono normalizado
+            Teléfono normalizado, o cadena vacía si no es un número español válido
         """
         if not telefono:
             return ""
             
         # Eliminar espacios, guiones y otros caracteres no numéricos
-        telefono_limpio = re.sub(r'[^0-9+]', '', telefono)
+        telefono_limpio = telefono.translate(SOLO_DIGITOS)
         
         # Asegurar que tenga prefijo +34
         if not telefono_limpio.startswith('+'):
@@ -149,9 +344,32 @@ class BaseExtractor:
                 telefono_limpio = '+' + telefono_limpio
             else:
                 telefono_limpio = '+34' + telefono_limpio
+        
+        # Descartar lo que no sea +34 seguido de 9 dígitos que empiecen por 6-9
+        if not TELEFONO_ES_RE.fullmatch(telefono_limpio):
+            return ""
                 
         return telefono_limpio
     
+    def buscar_telefono(self, texto: str) -> Optional[str]:
+        """
+        Devuelve el primer teléfono válido del texto, ya normalizado.
+        
+        Recorre PHONE_RE.finditer de forma perezosa y se detiene en el primer
+        candidato que normalizar_telefono acepta; los que no se normalizan se saltan.
+        
+        Args:
+            texto: Texto o HTML en el que buscar
+            
+        Returns:
+            Teléfono en formato +34XXXXXXXXX, o None si no hay ninguno válido
+        """
+        for match in PHONE_RE.finditer(texto):
+            telefono = self.normalizar_telefono(match.group())
+            if telefono:
+                return telefono
+        return None
+    
     def generar_link_whatsapp(self, telefono: str) -> Optional[str]:
         """
         Genera un enlace de WhatsApp para contacto directo.
@@ -165,9 +383,19 @@ class BaseExtractor:
         if not telefono:
             return None
             
-        telefono_limpio = telefono.replace('+34', '').replace(' ', '').replace('-', '')
-        mensaje = quote("mensaje a enviar... ")
-        return f"https://wa.me/34{telefono_limpio}?text={mensaje}"
+        telefono_limpio = telefono.removeprefix('+34').translate(SIN_SEPARADORES)
+        return f"https://wa.me/34{telefono_limpio}?text={MENSAJE_WHATSAPP}"
+    
+    def _marcar_fecha(self, contacto: Dict[str, Any]) -> None:
+        """
+        Añade al contacto la fecha de extracción legible y como epoch en segundos.
+        
+        isoformat evita interpretar una cadena de formato, y el epoch permite
+        ordenar o filtrar los resultados sin volver a parsear la fecha.
+        """
+        ahora = datetime.now()
+        contacto['fecha_extraccion'] = ahora.isoformat(' ', 'seconds')
+        contacto['fecha_extraccion_ts'] = int(ahora.timestamp())
     
     def extraer_info(self, url: str, zona: str, tipo_zona: str, keyword: str) -> Dict[str, Any]:
         """
@@ -178,10 +406,31 @@ class BaseExtractor:
 
 
 class StaticExtractor(BaseExtractor):
-    """Extractor para páginas estáticas usando requests y BeautifulSoup."""
+    """Extractor para páginas estáticas usando requests y expresiones regulares sobre el HTML."""
     
-    def __init__(self, config: Dict[str, Any]):
-        super().__init__(config)
+    def __init__(self, config: Dict[str, Any], robots_cache: Optional[Dict[str, Tuple[RobotFileParser, float]]] = None,
+                 sesion: Optional[requests.Session] = None):
+        super().__init__(config, robots_cache, sesion)
+        
+        # Tamaño máximo del cuerpo que se lee de cada página (0 = sin límite)
+        self.max_bytes_pagina = config.get('max_bytes_pagina', 262144)
+        
+        # Pool de procesos opcional para analizar el HTML sin competir por el GIL. Los
+        # procesos se crean con 'spawn': un fork copiaría los locks de logging y la cola
+        # del QueueListener de este proceso (que en el hijo no tiene quien la vacíe),
+        # así que sus logs llegan por una cola propia y se reenvían aquí
+        procesos = config.get('concurrencia', {}).get('procesos_analisis', 0)
+        self.pool_analisis = None
+        self._listener_logs = None
+        if procesos > 0:
+            contexto = multiprocessing.get_context('spawn')
+            cola_logs = contexto.Queue()
+            self._listener_logs = logging.handlers.QueueListener(cola_logs, _ReenvioLogs())
+            self._listener_logs.start()
+            self.pool_analisis = ProcessPoolExecutor(
+                max_workers=procesos, mp_context=contexto, initializer=_iniciar_proceso_analisis,
+                initargs=(config, cola_logs, logging.getLogger().getEffectiveLevel())
+            )
         # Rotación de User Agents para evitar bloqueos
         self.user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
@@ -202,6 +451,119 @@ class StaticExtractor(BaseExtractor):
             "Cache-Control": "max-age=0"
         }
     
+    def descargar(self, url: str) -> Tuple[int, Optional[str]]:
+        """
+        Descarga una página por bloques, leyendo como mucho `max_bytes_pagina` bytes.
+        
+        La descarga se corta en cuanto lo recibido contiene ya un email y un
+        teléfono válidos lejos del final del búfer (ver _tiene_contactos), de modo
+        que el resto de la página no cambiaría los primeros encontrados salvo casos
+        extremos, y así no se descargan ni analizan páginas de varios MB enteras.
+        
+        Args:
+            url: URL de la página
+            
+        Returns:
+            Tupla (código de estado HTTP, HTML decodificado o None si no es 200)
+        """
+        with self.sesion.get(url, headers=self._get_random_headers(), timeout=10, stream=True) as response:
+            if response.status_code != 200:
+                return response.status_code, None
+            codificacion = response.encoding or 'utf-8'
+            
+            # iter_content descomprime gzip/br: el límite se aplica al HTML real
+            contenido = bytearray()
+            for bloque in response.iter_content(BLOQUE_DESCARGA):
+                contenido += bloque
+                if self.max_bytes_pagina and len(contenido) >= self.max_bytes_pagina:
+                    del contenido[self.max_bytes_pagina:]
+                    break
+                if self._tiene_contactos(_decodificar(contenido, codificacion)):
+                    break
+        
+        return 200, _decodificar(contenido, codificacion)
+    
+    def _tiene_contactos(self, html: str) -> bool:
+        """
+        Indica si el texto visible del HTML parcial contiene ya un teléfono y un email válidos.
+        
+        Solo cuentan los que terminan al menos MARGEN_CORTE caracteres antes del
+        final del texto: más cerca del corte, el valor podría ser el prefijo de uno
+        más largo (p. ej. info@empresa.es de info@empresa.escuela.com, o 9 dígitos
+        de una cifra mayor). _texto_visible ya descarta lo que sigue a un
+        <script>/<style> o una etiqueta aún sin cerrar.
+        
+        Args:
+            html: HTML recibido hasta el momento
+            
+        Returns:
+            True si el primer teléfono y el primer email válidos ya no pueden cambiar
+        """
+        contenido = _texto_visible(html)
+        limite = len(contenido) - MARGEN_CORTE
+        
+        # Los candidatos se recorren en orden: si el primero válido queda pasado el
+        # límite, los siguientes también, y hay que seguir descargando
+        telefono = next(
+            (match for match in PHONE_RE.finditer(contenido) if self.normalizar_telefono(match.group())), None
+        )
+        if telefono is None or telefono.end() > limite:
+            return False
+        email = next(
+            (match for match in EMAIL_RE.finditer(contenido)
+             if 6 <= len(match.group()) <= 254 and self.validar_email(match.group().lower())), None
+        )
+        return email is not None and email.end() <= limite
+    
+    def analizar_html(self, html: str, url: str) -> Dict[str, Any]:
+        """
+        Extrae email, teléfono y nombre del HTML de una página ya descargada.
+        
+        No hace peticiones de red, por lo que puede ejecutarse en un proceso aparte.
+        
+        Args:
+            html: Contenido HTML de la página
+            url: URL de la página (para el nombre por defecto y los logs)
+        
+        Returns:
+            Diccionario con los campos de contacto encontrados
+        """
+        datos = {}
+        
+        # Buscar sobre el texto visible (más los destinos mailto:/tel:), obtenido con
+        # regex en lugar de recorrer el árbol completo con get_text()
+        contenido = _texto_visible(html)
+        
+        # Buscar email
+        email = self.buscar_email(contenido)
+        if email:
+            datos['email'] = email
+        
+        # Buscar teléfono
+        telefono_normalizado = self.buscar_telefono(contenido)
+        if telefono_normalizado:
+            datos['telefono'] = telefono_normalizado
+            datos['whatsapp_link'] = self.generar_link_whatsapp(telefono_normalizado)
+        
+        # Extraer título como nombre
+        title_match = TITLE_RE.search(html)
+        if title_match:
+            title = unescape(title_match.group(1)).strip()
+            datos['nombre'] = title.split('|')[0].strip()
+        else:
+            datos['nombre'] = urlsplit(url).netloc
+        
+        return datos
+    
+    def cerrar(self) -> None:
+        """Libera el pool de procesos de análisis, si existe, tras recibir sus últimos logs."""
+        if self.pool_analisis is not None:
+            self.pool_analisis.shutdown(wait=True)
+            self.pool_analisis = None
+        if self._listener_logs is not None:
+            self._listener_logs.stop()
+            self._listener_logs = None
+    
     def extraer_info(self, url: str, zona: str, tipo_zona: str, keyword: str) -> Dict[str, Any]:
         """
         Extrae información de contacto de una página estática.
@@ -212,6 +574,26 @@ class StaticExtractor(BaseExtractor):
             tipo_zona: Tipo de zona ('comunidad' o 'ciudad')
             keyword: Palabra clave que generó este resultado
             
+        Returns:
+            Diccionario con la información de contacto extraída
+        """
+        return self.extraer_info_desde_html(url, None, zona, tipo_zona, keyword)
+    
+    def extraer_info_desde_html(self, url: str, html: Optional[str], zona: str, tipo_zona: str,
+                                keyword: str) -> Dict[str, Any]:
+        """
+        Extrae información de contacto de una página estática ya descargada.
+        
+        Permite reutilizar el HTML obtenido en el análisis previo del selector
+        en lugar de volver a pedir la misma URL.
+        
+        Args:
+            url: URL de la página
+            html: HTML de la página, o None para descargarla
+            zona: Nombre de la zona (comunidad o ciudad)
+            tipo_zona: Tipo de zona ('comunidad' o 'ciudad')
+            keyword: Palabra clave que generó este resultado
+            
         Returns:
             Diccionario con la información de contacto extraída
         """
@@ -228,59 +610,25 @@ class StaticExtractor(BaseExtractor):
             return contacto
         
         try:
-            headers = self._get_random_headers()
-            response = requests.get(url, headers=headers, timeout=10)
-            
-            if response.status_code != 200:
-                self.logger.warning(f"Error {response.status_code} al acceder a {url}")
-                return contacto
+            if html is None:
+                estado, html = self.descargar(url)
                 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extraer todo el texto visible de la página
-            visible_text = soup.get_text()
-            
-            # Buscar email
-            email_matches = re.findall(self.email_pattern, visible_text)
-            email_valido = False
-            
-            for email in email_matches:
-                email_lower = email.lower()
-                if self.validar_email(email_lower):
-                    contacto['email'] = email_lower
-                    email_valido = True
-                    self.logger.info(f"Email válido encontrado: {email_lower}")
-                    break
-                else:
-                    self.logger.debug(f"Email descartado: {email_lower}")
-            
-            if not email_valido and email_matches:
-                self.logger.info(f"Se encontraron {len(email_matches)} posibles emails, pero ninguno pasó la validación")
-            
-            # Buscar teléfono
-            phone_matches = re.findall(self.phone_pattern, visible_text)
-            if phone_matches:
-                telefono_normalizado = self.normalizar_telefono(phone_matches[0])
-                contacto['telefono'] = telefono_normalizado
-                contacto['whatsapp_link'] = self.generar_link_whatsapp(telefono_normalizado)
-            
-            # Extraer título como nombre
-            title_tag = soup.find('title')
-            if title_tag:
-                title = title_tag.text.strip()
-                contacto['nombre'] = title.split('|')[0].strip()
+                if estado != 200:
+                    self.logger.warning(f"Error {estado} al acceder a {url}")
+                    return contacto
+                
+            # El análisis (regex sobre el HTML) es CPU puro: se puede delegar en otro proceso
+            if self.pool_analisis is not None:
+                datos = self.pool_analisis.submit(_analizar_html_en_proceso, html, url).result()
             else:
-                contacto['nombre'] = url.split('/')[2]
+                datos = self.analizar_html(html, url)
+            contacto.update(datos)
             
             # Añadir timestamp
-            from datetime import datetime
-            contacto['fecha_extraccion'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self._marcar_fecha(contacto)
             
             self.logger.info(f"Información extraída de {url}")
             
-            # Delay para evitar sobrecarga
-            time.sleep(random.uniform(self.delay_range[0], self.delay_range[1]))
-            
             return contacto
             
         except Exception as e:
@@ -288,16 +636,94 @@ class StaticExtractor(BaseExtractor):
             return contacto
 
 
+def _texto_visible(html: str) -> str:
+    """
+    Reduce el HTML al texto visible más los destinos de los enlaces mailto:/tel:.
+    
+    Quita scripts, estilos y comentarios, cambia cada etiqueta por un espacio (o
+    por el destino de su href mailto:/tel:) y decodifica las entidades, de modo
+    que los valores de atributos como src o data-* no se toman por emails o
+    teléfonos. En un HTML cortado se descarta lo que sigue a un <script>/<style>
+    o a una etiqueta sin cerrar.
+    
+    Args:
+        html: Contenido HTML, completo o parcial
+        
+    Returns:
+        Texto en el que buscar contactos
+    """
+    contenido = SCRIPT_STYLE_RE.sub(' ', html)
+    abierto = SCRIPT_STYLE_ABIERTO_RE.search(contenido)
+    if abierto:
+        contenido = contenido[:abierto.start()]
+    inicio_etiqueta = contenido.rfind('<')
+    if inicio_etiqueta > contenido.rfind('>'):
+        contenido = contenido[:inicio_etiqueta]
+    return unescape(ETIQUETA_RE.sub(_sustituir_etiqueta, contenido))
+
+
+def _sustituir_etiqueta(match: re.Match) -> str:
+    """Devuelve el destino decodificado de un enlace mailto:/tel:, o un espacio para el resto de etiquetas."""
+    destino = match.group(1) or match.group(2) or match.group(3)
+    return f' {unquote(destino)} ' if destino else ' '
+
+
+def _decodificar(contenido: bytes, codificacion: str) -> str:
+    """Decodifica el cuerpo de una respuesta, usando UTF-8 si la codificación no existe."""
+    try:
+        return contenido.decode(codificacion, errors='replace')
+    except LookupError:
+        return contenido.decode('utf-8', errors='replace')
+
+
+# Extractor propio de cada proceso del pool de análisis (se crea en el inicializador)
+_extractor_proceso: Optional[StaticExtractor] = None
+
+class _ReenvioLogs(logging.Handler):
+    """Entrega al logger del mismo nombre de este proceso los registros de los procesos de análisis."""
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        logging.getLogger(record.name).handle(record)
+
+
+def _iniciar_proceso_analisis(config: Dict[str, Any], cola_logs: Any, nivel_log: int) -> None:
+    """
+    Prepara un proceso del pool de análisis: sus logs y el extractor que usará.
+    
+    Args:
+        config: Configuración del sistema
+        cola_logs: Cola por la que se envían los logs al proceso principal
+        nivel_log: Nivel de log efectivo del proceso principal
+    """
+    global _extractor_proceso
+    raiz = logging.getLogger()
+    raiz.handlers[:] = [logging.handlers.QueueHandler(cola_logs)]
+    raiz.setLevel(nivel_log)
+    
+    # Dentro del proceso el análisis es local: no se crea otro pool
+    concurrencia = dict(config.get('concurrencia', {}), procesos_analisis=0)
+    _extractor_proceso = StaticExtractor(dict(config, concurrencia=concurrencia))
+
+def _analizar_html_en_proceso(html: str, url: str) -> Dict[str, Any]:
+    """Analiza el HTML en un proceso del pool con su extractor local."""
+    return _extractor_proceso.analizar_html(html, url)
+
+
 class DynamicExtractor(BaseExtractor):
     """Extractor para páginas que requieren JavaScript usando Selenium."""
     
-    def __init__(self, config: Dict[str, Any]):
-        super().__init__(config)
-        self.driver = None
+    def __init__(self, config: Dict[str, Any], robots_cache: Optional[Dict[str, Tuple[RobotFileParser, float]]] = None,
+                 sesion: Optional[requests.Session] = None):
+        super().__init__(config, robots_cache, sesion)
+        self.timeout = config['selenium']['timeout']
+        # Un driver de Selenium no es thread-safe: cada hilo toma uno libre del pool
+        # y lo devuelve al terminar
+        self.drivers: List[webdriver.Chrome] = []
+        self._drivers_libres: queue.Queue = queue.Queue()
         self.setup_driver()
     
     def setup_driver(self):
-        """Configura el navegador Chrome con opciones para evitar detección."""
+        """Configura el pool de navegadores Chrome con opciones para evitar detección."""
         chrome_options = Options()
         
         if self.config['selenium']['headless']:
@@ -310,22 +736,38 @@ class DynamicExtractor(BaseExtractor):
         chrome_options.add_argument('--disable-blink-features=AutomationControlled')
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option('useAutomationExtension', False)
+        # No descargar imágenes: no aportan datos de contacto y son la mayor parte del peso de cada página
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
         
         user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
         chrome_options.add_argument(f'user-agent={user_agent}')
         
         try:
-            self.driver = webdriver.Chrome(
-                service=Service(ChromeDriverManager().install()),
-                options=chrome_options
-            )
-            self.driver.implicitly_wait(self.config['selenium']['timeout'])
-            self.wait = WebDriverWait(self.driver, self.config['selenium']['timeout'])
-            self.logger.info("Driver de Selenium configurado exitosamente")
+            # Sin ruta configurada, Selenium Manager localiza el chromedriver adecuado y lo
+            # guarda en ~/.cache/selenium: no hay descarga ni consulta de versión en cada arranque
+            ruta_driver = self.config['selenium'].get('driver_path') or None
+            for _ in range(max(1, self.config['selenium'].get('drivers', 1))):
+                driver = webdriver.Chrome(service=Service(ruta_driver), options=chrome_options)
+                # Sin espera implícita (solo hay esperas explícitas) y con la carga de
+                # página acotada, en lugar de los 300 s por defecto de chromedriver
+                driver.set_page_load_timeout(self.timeout)
+                self.drivers.append(driver)
+                self._drivers_libres.put(driver)
+            self.logger.info(f"Driver de Selenium configurado exitosamente ({len(self.drivers)} instancias)")
         except Exception as e:
             self.logger.error(f"Error al configurar el driver de Selenium: {str(e)}")
             raise
     
+    @contextmanager
+    def _usar_driver(self) -> Iterator[webdriver.Chrome]:
+        """Toma un driver libre del pool durante el bloque, esperando si están todos ocupados."""
+        driver = self._drivers_libres.get()
+        try:
+            yield driver
+        finally:
+            self._drivers_libres.put(driver)
+    
     def extraer_info(self, url: str, zona: str, tipo_zona: str, keyword: str) -> Dict[str, Any]:
         """
         Extrae información de contacto de una página dinámica con JavaScript.
@@ -352,71 +794,97 @@ class DynamicExtractor(BaseExtractor):
             return contacto
         
         try:
-            self.driver.get(url)
-            
-            # Esperar a que la página cargue completamente
-            time.sleep(random.uniform(1, 3))
+            with self._usar_driver() as driver:
+                driver.get(url)
+                
+                # Esperar a que el documento termine de cargar en lugar de una pausa fija
+                # (si ya está completo, la comprobación vuelve de inmediato)
+                WebDriverWait(driver, self.timeout).until(
+                    lambda d: d.execute_script('return document.readyState') == 'complete'
+                )
+                
+                # Obtener contenido de la página
+                page_source = driver.page_source
+                title = driver.title
             
-            # Obtener contenido de la página
-            page_source = self.driver.page_source
+            # Buscar sobre el texto visible, igual que el extractor estático
+            texto = _texto_visible(page_source)
             
             # Buscar email
-            email_matches = re.findall(self.email_pattern, page_source)
-            email_valido = False
-            
-            for email in email_matches:
-                email_lower = email.lower()
-                if self.validar_email(email_lower):
-                    contacto['email'] = email_lower
-                    email_valido = True
-                    self.logger.info(f"Email válido encontrado: {email_lower}")
-                    break
-                else:
-                    self.logger.debug(f"Email descartado: {email_lower}")
-            
-            if not email_valido and email_matches:
-                self.logger.info(f"Se encontraron {len(email_matches)} posibles emails, pero ninguno pasó la validación")
+            email = self.buscar_email(texto)
+            if email:
+                contacto['email'] = email
             
             # Buscar teléfono
-            phone_matches = re.findall(self.phone_pattern, page_source)
-            if phone_matches:
-                for phone in phone_matches:
-                    telefono_normalizado = self.normalizar_telefono(phone)
-                    if telefono_normalizado:
-                        contacto['telefono'] = telefono_normalizado
-                        contacto['whatsapp_link'] = self.generar_link_whatsapp(telefono_normalizado)
-                        break
+            telefono_normalizado = self.buscar_telefono(texto)
+            if telefono_normalizado:
+                contacto['telefono'] = telefono_normalizado
+                contacto['whatsapp_link'] = self.generar_link_whatsapp(telefono_normalizado)
             
             # Extraer título como nombre
-            try:
-                title = self.driver.title
+            if title:
                 contacto['nombre'] = title.split('|')[0].strip()
-            except:
-                contacto['nombre'] = url.split('/')[2]
+            else:
+                contacto['nombre'] = urlsplit(url).netloc
             
             # Añadir timestamp
-            from datetime import datetime
-            contacto['fecha_extraccion'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self._marcar_fecha(contacto)
             
             self.logger.info(f"Información extraída de {url} usando Selenium")
             
-            # Delay para evitar sobrecarga
-            time.sleep(random.uniform(self.delay_range[0], self.delay_range[1]))
-            
             return contacto
             
         except Exception as e:
             self.logger.error(f"Error al extraer información de {url} con Selenium: {str(e)}")
             return contacto
     
-    def __del__(self):
-        """Cierra el driver al destruir la instancia."""
-        try:
-            if self.driver:
-                self.driver.quit()
+    def cerrar(self) -> None:
+        """Cierra todos los drivers del pool (se puede llamar más de una vez)."""
+        drivers, self.drivers = getattr(self, 'drivers', []), []
+        for driver in drivers:
+            try:
+                driver.quit()
                 self.logger.info("Driver de Selenium cerrado correctamente")
-        except Exception as e:
-            self.logger.error(f"Error al cerrar el driver de Selenium: {str(e)}")
+            except Exception as e:
+                self.logger.error(f"Error al cerrar el driver de Selenium: {str(e)}")
+    
+    def __del__(self):
+        """Cierra los drivers si no se llamó a cerrar() antes de destruir la instancia."""
+        self.cerrar()
+
+
+# Términos que delatan páginas dependientes de JavaScript (definidos una sola vez;
+# un `in` por término sobre el HTML en minúsculas es más rápido en CPython que una
+# regex con alternativas)
+JS_FRAMEWORKS = (
+    'vue', 'react', 'angular', 'jquery', 'next.js', 'nuxt', 
+    'typescript', 'svelte', 'meteor', 'ember'
+)
+
+JS_INDICADORES = (
+    # JavaScript para mostrar datos dinámicamente
+    'onclick=', 'onmouseover=', 'document.write', 'document.getElementById',
+    '.innerHTML', 'fetch(', 'axios.', '.ajax', '.post(', '.get(',
+    
+    # Protección de contactos
+    'data-email', 'data-tel', 'protected-email', 'decode(', 'unveil(', 
+    'reveal', 'protected-content', 'data-cfemail',
+    
+    # Frameworks generales
+    'app.js', 'bundle.js', 'main.js',
+    
+    # Carga diferida
+    'lazy-load', 'lazy-src', 'data-src', 'loading="lazy"',
+    
+    # SPA (Single Page Applications)
+    'router-view', 'router-link', 'ng-view', 'data-route'
+)
+
+# Textos que delatan contactos protegidos o rellenados por JavaScript
+CONTACTOS_PROTEGIDOS = ('[email protected]', 'email-protected', 'contact@', 'info@')
+
+# Atributo class con alguna de las clases habituales de contacto (sobre el HTML en minúsculas)
+CLASE_CONTACTO_RE = re.compile(r'class\s*=\s*["\'][^"\']*(?<![\w-])(?:email|contact-email|contact-phone)(?![\w-])')
 
 
 class ExtractorSelector:
@@ -425,138 +893,122 @@ class ExtractorSelector:
     Implementa un sistema híbrido que elige entre extractores estáticos y dinámicos.
     """
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], limitador: Optional[DomainLimiter] = None,
+                 robots_cache: Optional[Dict[str, Tuple[RobotFileParser, float]]] = None,
+                 sesion: Optional[requests.Session] = None):
         """
         Inicializa el selector de extractores.
         
         Args:
             config: Configuración del sistema
+            limitador: Limitador de peticiones por dominio (se crea uno si no se indica)
+            robots_cache: Caché de robots.txt compartida por ambos extractores
+            sesion: Sesión HTTP compartida para el análisis previo y el extractor estático
         """
-        self.static_extractor = StaticExtractor(config)
-        self.dynamic_extractor = DynamicExtractor(config)
+        self.sesion = sesion or crear_sesion_http(config)
+        self.limitador = limitador or DomainLimiter(config['delays']['entre_extracciones'])
+        self.robots_cache = robots_cache if robots_cache is not None else {}
+        self.static_extractor = StaticExtractor(config, self.robots_cache, self.sesion)
+        self.dynamic_extractor = DynamicExtractor(config, self.robots_cache, self.sesion)
         self.logger = logging.getLogger('ExtractorSelector')
         
-        # Dominios que sabemos que requieren JavaScript
-        self.js_required_domains = [
+        # Pool de hilos para procesar en paralelo las URLs de cada búsqueda
+        max_workers = config.get('concurrencia', {}).get('extracciones', 8)
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='extractor')
+        
+        # Dominios que sabemos que requieren JavaScript (conjunto: la comprobación
+        # por host es una búsqueda por cada sufijo del host, no un recorrido de la lista)
+        self.js_required_domains = {
             # Agregar aquí dominios conocidos que requieren JS
             'infoempresa.com', 'facebook.com', 'instagram.com', 'linkedin.com',
             'twitter.com', 'einforma.com', 'empresite.eleconomista.es',
             'guiaempresas.universia.es', 'expansion.com', 'axesor.es'
-        ]
+        }
     
-    def necesita_javascript(self, url: str) -> bool:
+    def necesita_javascript(self, url: str) -> Tuple[bool, Optional[str]]:
         """
         Determina de manera robusta si una URL probablemente necesita JavaScript para cargar contenido.
         
+        La página descargada para el análisis se devuelve para que el extractor
+        estático la reutilice sin una segunda petición.
+        
         Args:
             url: URL a evaluar
             
         Returns:
-            True si probablemente necesita JS, False en caso contrario
+            Tupla (necesita JS, HTML de la página o None si no se descargó)
         """
-        # 1. Verificar lista de dominios conocidos
-        for dominio in self.js_required_domains:
-            if dominio in url:
-                return True
+        # 1. Verificar lista de dominios conocidos (sobre el host, no sobre la URL
+        # completa, para no confundir rutas o parámetros que mencionen esos dominios)
+        etiquetas = (urlsplit(url).hostname or '').split('.')
+        for i in range(len(etiquetas) - 1):
+            if '.'.join(etiquetas[i:]) in self.js_required_domains:
+                return True, None
         
-        # 2. Realizar análisis preliminar
+        # 2. Realizar análisis preliminar (con la misma descarga que el extractor estático)
         try:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8"
-            }
-            r = requests.get(url, headers=headers, timeout=5)
+            estado, texto = self.static_extractor.descargar(url)
             
-            if r.status_code != 200:
+            if estado != 200:
                 # Si hay problemas para acceder, usar Selenium por seguridad
-                return True
+                return True, None
                 
-            html = r.text.lower()
+            html = texto.lower()
             
             # 3. Buscar frameworks y bibliotecas JavaScript
-            js_frameworks = [
-                'vue', 'react', 'angular', 'jquery', 'next.js', 'nuxt', 
-                'typescript', 'svelte', 'meteor', 'ember'
-            ]
-            
-            for framework in js_frameworks:
+            for framework in JS_FRAMEWORKS:
                 if framework in html:
                     self.logger.info(f"Detectado framework {framework} en {url}")
-                    return True
+                    return True, texto
             
             # 4. Buscar indicadores de interactividad JavaScript
-            js_indicators = [
-                # JavaScript para mostrar datos dinámicamente
-                'onclick=', 'onmouseover=', 'document.write', 'document.getElementById',
-                '.innerHTML', 'fetch(', 'axios.', '.ajax', '.post(', '.get(',
-                
-                # Protección de contactos
-                'data-email', 'data-tel', 'protected-email', 'decode(', 'unveil(', 
-                'reveal', 'protected-content', 'data-cfemail',
-                
-                # Frameworks generales
-                'app.js', 'bundle.js', 'main.js',
-                
-                # Carga diferida
-                'lazy-load', 'lazy-src', 'data-src', 'loading="lazy"',
-                
-                # SPA (Single Page Applications)
-                'router-view', 'router-link', 'ng-view', 'data-route'
-            ]
-            
-            for indicator in js_indicators:
+            for indicator in JS_INDICADORES:
                 if indicator in html:
                     self.logger.info(f"Detectado indicador JS '{indicator}' en {url}")
-                    return True
+                    return True, texto
                     
             # 5. Verificar ocultamiento de correos y teléfonos
-            # Buscar patrones que sugieren que los contactos están protegidos
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Patrones comunes de protección
-            if len(soup.select('span[data-email]')) > 0 or len(soup.select('[data-tel]')) > 0:
-                return True
-                
-            # Verificar si existen elementos que parecen contactos pero están codificados o vacíos
-            contact_patterns = [
-                '[email protected]', 'email-protected', 'contact@', 'info@',
-                'span.email', 'div.email', '.contact-email', '.contact-phone'
-            ]
+            # Buscar patrones que sugieren que los contactos están protegidos o vacíos
+            # (los atributos data-email y data-tel ya se detectan como indicadores JS)
+            for pattern in CONTACTOS_PROTEGIDOS:
+                if pattern in html:
+                    return True, texto
             
-            for pattern in contact_patterns:
-                if pattern in html or soup.select(pattern):
-                    return True
+            # Elementos con clase de contacto (equivale a span.email, div.email,
+            # .contact-email y .contact-phone sin construir el árbol DOM)
+            if CLASE_CONTACTO_RE.search(html):
+                return True, texto
             
             # 6. Verificar la ausencia de información de contacto visible
             # Si no hay teléfonos ni correos visibles, probablemente estén ocultos con JS
-            email_regex = r'[\w\.-]+@[\w\.-]+\.\w+'
-            phone_regex = r'(?:\+34|34)?[ -]?[6789]\d{2}[ -]?\d{2}[ -]?\d{2}[ -]?\d{2}'
-            
-            emails_found = re.findall(email_regex, html)
-            phones_found = re.findall(phone_regex, html)
+            # (basta la primera coincidencia: no se construyen listas con todas)
+            hay_contactos = EMAIL_SONDEO_RE.search(html) or PHONE_SONDEO_RE.search(html)
             
             # Si hay mucho contenido pero no hay contactos visibles, probablemente necesite JS
-            if len(html) > 10000 and not emails_found and not phones_found:
+            if len(html) > 10000 and not hay_contactos:
                 self.logger.info(f"Página grande sin contactos visibles en {url}, probablemente necesite JS")
-                return True
+                return True, texto
             
             # Si parece ser una página de contacto pero no hay información visible, usar JS
-            if 'contacto' in url.lower() or 'contact' in url.lower():
-                if not emails_found and not phones_found:
-                    return True
+            if 'contact' in url.lower() and not hay_contactos:
+                return True, texto
             
             # Default: si pasó todas las verificaciones, probablemente no necesite JS
-            return False
+            return False, texto
             
         except Exception as e:
             self.logger.warning(f"Error al analizar {url}, usando Selenium por precaución: {str(e)}")
             # En caso de error, usar Selenium por seguridad
-            return True
+            return True, None
     
     def extraer_informacion(self, url: str, zona: str, tipo_zona: str, keyword: str) -> Dict[str, Any]:
         """
         Extrae información de contacto usando el extractor más adecuado.
         
+        Si la página se pudo descargar se analiza siempre primero su HTML, y
+        Selenium solo se usa cuando parece necesitar JavaScript y el análisis
+        estático no encontró ningún contacto.
+        
         Args:
             url: URL a procesar
             zona: Zona geográfica
@@ -566,9 +1018,72 @@ class ExtractorSelector:
         Returns:
             Diccionario con la información de contacto
         """
-        if self.necesita_javascript(url):
+        # Todas las peticiones a un mismo dominio pasan por el limitador
+        with self.limitador.acquire(url):
+            necesita_js, html = self.necesita_javascript(url)
+            if html is not None:
+                contacto = self.static_extractor.extraer_info_desde_html(url, html, zona, tipo_zona, keyword)
+                if not self._resultado_estatico_vacio(contacto, necesita_js):
+                    self.logger.info(f"Usando extractor estático para {url}")
+                    return contacto
+            
             self.logger.info(f"Usando extractor dinámico para {url}")
             return self.dynamic_extractor.extraer_info(url, zona, tipo_zona, keyword)
-        else:
-            self.logger.info(f"Usando extractor estático para {url}")
-            return self.static_extractor.extraer_info(url, zona, tipo_zona, keyword)
\ No newline at end of file
+    
+    def _resultado_estatico_vacio(self, contacto: Dict[str, Any], necesita_js: bool) -> bool:
+        """
+        Indica si hay que repetir la extracción con Selenium.
+        
+        Args:
+            contacto: Resultado del extractor estático
+            necesita_js: Decisión del análisis preliminar de la página
+            
+        Returns:
+            True si la página parece depender de JS y no se encontró email ni teléfono
+        """
+        return necesita_js and not (contacto.get('email') or contacto.get('telefono'))
+    
+    def extraer_lote(self, urls: List[str], zona: str, tipo_zona: str, keyword: str) -> List[Dict[str, Any]]:
+        """
+        Extrae en paralelo la información de contacto de un lote de URLs.
+        
+        La extracción está dominada por la espera de red, por lo que repartir
+        las URLs entre varios hilos reduce el tiempo total de cada búsqueda.
+        
+        Args:
+            urls: URLs a procesar
+            zona: Zona geográfica
+            tipo_zona: Tipo de zona ('comunidad' o 'ciudad')
+            keyword: Palabra clave que generó estos resultados
+            
+        Returns:
+            Lista de diccionarios de contacto, en el mismo orden que las URLs
+        """
+        return [futuro.result() for futuro in self.enviar_lote(urls, zona, tipo_zona, keyword)]
+    
+    def enviar_lote(self, urls: List[str], zona: str, tipo_zona: str, keyword: str) -> List[Future]:
+        """
+        Encola la extracción de un lote de URLs sin esperar a que termine.
+        
+        Permite lanzar la siguiente búsqueda mientras el lote anterior se
+        sigue descargando en el pool.
+        
+        Args:
+            urls: URLs a procesar
+            zona: Zona geográfica
+            tipo_zona: Tipo de zona ('comunidad' o 'ciudad')
+            keyword: Palabra clave que generó estos resultados
+            
+        Returns:
+            Lista de futuros con los diccionarios de contacto, en el mismo orden que las URLs
+        """
+        return [
+            self.pool.submit(self.extraer_informacion, url, zona, tipo_zona, keyword)
+            for url in urls
+        ]
+    
+    def cerrar(self) -> None:
+        """Libera el pool de hilos de extracción, el de procesos de análisis y los navegadores."""
+        self.pool.shutdown(wait=True)
+        self.static_extractor.cerrar()
+        self.dynamic_extractor.cerrar()
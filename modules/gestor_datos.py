@@ -1,10 +1,17 @@
 import os
-import json
-import pandas as pd
+import csv
+import time
+import orjson
 import logging
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+# Columnas del volcado incremental en CSV (el esquema debe ser fijo para poder añadir filas)
+CAMPOS_VOLCADO = [
+    'nombre', 'email', 'telefono', 'whatsapp_link', 'url', 'zona', 'tipo_zona',
+    'keyword', 'relevancia', 'fecha_extraccion', 'fecha_extraccion_ts'
+]
+
 class GestorDatos:
     """
     Gestiona el almacenamiento, eliminación de duplicados y exportación de datos.
@@ -22,9 +29,25 @@ class GestorDatos:
         self.contactos = []
         self.urls_vistas = set()
         self.telefonos_vistos = set()
-        self.ultimo_guardado = datetime.now()
+        # Totales mantenidos al agregar para no recorrer todos los contactos en cada consulta
+        self.total_con_email = 0
+        self.total_con_telefono = 0
+        self.total_alta_relevancia = 0
+        self.total_media_relevancia = 0
+        self.zonas_comunidad = set()
+        self.zonas_ciudad = set()
+        # Reloj monotónico: solo se compara con el intervalo, no se muestra
+        self.ultimo_guardado = time.monotonic()
         self.intervalo_guardado = config['guardado']['intervalo']  # segundos
         
+        # Volcado incremental: contactos pendientes de escribir y tamaño de lote
+        self.tamano_lote = config['guardado'].get('lote', 500)
+        self._indice_volcado = 0
+        directorio = config['guardado'].get('directorio', 'results')
+        self.archivo_volcado = os.path.join(
+            directorio, f'contactos_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+        )
+        
         # Umbral de relevancia configurable (0-100)
         self.umbral_relevancia = config.get('umbral_relevancia', 40)
         
@@ -41,29 +64,35 @@ class GestorDatos:
         Returns:
             True si se agregó, False si era duplicado o no relevante
         """
+        agregado = self._agregar(contacto)
+        if agregado:
+            self._comprobar_volcado()
+        return agregado
+    
+    def _agregar(self, contacto: Dict[str, Any]) -> bool:
+        """Filtra y almacena un contacto en memoria, sin comprobar el volcado a disco."""
         url = contacto.get('url')
         telefono = contacto.get('telefono')
         
         # Verificar si ya tenemos este contacto
-        if url in self.urls_vistas:
-            return False
-            
-        if telefono and telefono in self.telefonos_vistos:
+        if url in self.urls_vistas or (telefono and telefono in self.telefonos_vistos):
             return False
         
         # Filtrar por teléfono si está configurado
         if self.filtrar_sin_telefono and not telefono:
-            self.logger.info(f"Contacto filtrado por falta de teléfono: {url}")
+            self.logger.info("Contacto filtrado por falta de teléfono: %s", url)
             return False
         
         # Filtrar por relevancia si está disponible
-        if 'es_relevante' in contacto:
-            if not contacto['es_relevante']:
-                self.logger.info(f"Contacto filtrado por baja relevancia ({contacto.get('relevancia', 0)}%): {url}")
+        es_relevante = contacto.get('es_relevante')
+        relevancia = contacto.get('relevancia')
+        if es_relevante is not None:
+            if not es_relevante:
+                self.logger.info("Contacto filtrado por baja relevancia (%s%%): %s", relevancia or 0, url)
                 return False
-        elif 'relevancia' in contacto:
-            if contacto['relevancia'] < self.umbral_relevancia:
-                self.logger.info(f"Contacto filtrado por baja relevancia ({contacto['relevancia']}%): {url}")
+        elif relevancia is not None:
+            if relevancia < self.umbral_relevancia:
+                self.logger.info("Contacto filtrado por baja relevancia (%s%%): %s", relevancia, url)
                 return False
         
         # Agregar a las colecciones
@@ -71,39 +100,71 @@ class GestorDatos:
         self.urls_vistas.add(url)
         if telefono:
             self.telefonos_vistos.add(telefono)
+            self.total_con_telefono += 1
+        if contacto.get('email'):
+            self.total_con_email += 1
+        self._registrar_zona(contacto)
+        self._registrar_relevancia(relevancia or 0)
             
-        self.logger.info(f"Contacto agregado: {url}")
-        
-        # Verificar si es momento de guardar
-        delta = (datetime.now() - self.ultimo_guardado).total_seconds()
-        if delta >= self.intervalo_guardado:
-            self.guardar_resultados()
-            self.ultimo_guardado = datetime.now()
+        self.logger.info("Contacto agregado: %s", url)
             
         return True
     
+    def _registrar_zona(self, contacto: Dict[str, Any]) -> None:
+        """Anota la zona del contacto en el conjunto de comunidades o de ciudades."""
+        tipo_zona = contacto.get('tipo_zona')
+        if tipo_zona == 'comunidad':
+            self.zonas_comunidad.add(contacto.get('zona'))
+        elif tipo_zona == 'ciudad':
+            self.zonas_ciudad.add(contacto.get('zona'))
+    
+    def _registrar_relevancia(self, relevancia: float) -> None:
+        """Suma el contacto al tramo de relevancia alta (>= 70) o media (40-69)."""
+        if relevancia >= 70:
+            self.total_alta_relevancia += 1
+        elif relevancia >= 40:
+            self.total_media_relevancia += 1
+    
+    def _comprobar_volcado(self) -> None:
+        """Vuelca a disco si se ha llenado el lote o ha pasado el intervalo de guardado."""
+        pendientes = len(self.contactos) - self._indice_volcado
+        delta = time.monotonic() - self.ultimo_guardado
+        if pendientes >= self.tamano_lote or delta >= self.intervalo_guardado:
+            self.volcar_pendientes()
+    
     def agregar_multiples_contactos(self, nuevos_contactos: List[Dict[str, Any]]) -> int:
         """
         Agrega múltiples contactos, filtrando duplicados.
         
+        La comprobación de volcado a disco se hace una sola vez para todo el lote.
+        
         Args:
             nuevos_contactos: Lista de contactos a agregar
             
         Returns:
             Número de contactos agregados
         """
-        contador = 0
-        for contacto in nuevos_contactos:
-            if self.agregar_contacto(contacto):
-                contador += 1
+        contador = sum(1 for contacto in nuevos_contactos if self._agregar(contacto))
+        if contador:
+            self._comprobar_volcado()
                 
         return contador
     
     def eliminar_duplicados(self) -> None:
         """Elimina contactos duplicados basándose en URL y teléfono."""
+        # _agregar ya descarta duplicados: si cada contacto tiene una URL distinta
+        # registrada, la lista está limpia y no hace falta reconstruirla
+        if len(self.contactos) == len(self.urls_vistas):
+            return
+        
         contactos_unicos = []
         urls_vistas = set()
         telefonos_vistos = set()
+        con_email = 0
+        self.zonas_comunidad = set()
+        self.zonas_ciudad = set()
+        self.total_alta_relevancia = 0
+        self.total_media_relevancia = 0
         
         for contacto in self.contactos:
             url = contacto.get('url')
@@ -114,12 +175,51 @@ class GestorDatos:
                 urls_vistas.add(url)
                 if telefono:
                     telefonos_vistos.add(telefono)
+                if contacto.get('email'):
+                    con_email += 1
+                self._registrar_zona(contacto)
+                self._registrar_relevancia(contacto.get('relevancia') or 0)
         
         self.contactos = contactos_unicos
         self.urls_vistas = urls_vistas
         self.telefonos_vistos = telefonos_vistos
+        self.total_con_email = con_email
+        self.total_con_telefono = len(telefonos_vistos)
         
-        self.logger.info(f"Duplicados eliminados. Contactos únicos: {len(self.contactos)}")
+        self.logger.info("Duplicados eliminados. Contactos únicos: %s", len(self.contactos))
+    
+    def volcar_pendientes(self) -> None:
+        """
+        Añade al CSV de la sesión los contactos agregados desde el último volcado.
+        
+        Escribe solo las filas nuevas en modo append, en lugar de serializar de
+        nuevo todos los contactos en cada guardado periódico.
+        """
+        nuevos = self.contactos[self._indice_volcado:]
+        self.ultimo_guardado = time.monotonic()
+        if not nuevos:
+            return
+        
+        os.makedirs(os.path.dirname(self.archivo_volcado) or '.', exist_ok=True)
+        escribir_cabecera = not os.path.exists(self.archivo_volcado)
+        
+        with open(self.archivo_volcado, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if escribir_cabecera:
+                writer.writerow(CAMPOS_VOLCADO)
+            writer.writerows([c.get(campo, '') for campo in CAMPOS_VOLCADO] for c in nuevos)
+        
+        self._indice_volcado = len(self.contactos)
+        self.logger.info("%s contactos añadidos a %s", len(nuevos), self.archivo_volcado)
+    
+    def _campos_exportacion(self) -> List[str]:
+        """
+        Obtiene las columnas de la exportación completa.
+        
+        Returns:
+            Campos presentes en algún contacto, en orden de aparición
+        """
+        return list(dict.fromkeys(campo for c in self.contactos for campo in c))
     
     def guardar_resultados(self) -> None:
         """Guarda los resultados en archivos CSV y JSON."""
@@ -127,8 +227,12 @@ class GestorDatos:
             self.logger.warning("No hay contactos para guardar")
             return
             
+        # Volcar lo pendiente al CSV incremental antes de la exportación completa
+        self.volcar_pendientes()
+        
         # Primero eliminar posibles duplicados
         self.eliminar_duplicados()
+        self._indice_volcado = len(self.contactos)
 
         # Obtener directorio de guardado desde la configuración
         directorio = self.config.get('guardado', {}).get('directorio', 'results')
@@ -136,20 +240,22 @@ class GestorDatos:
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # Guardar en CSV
-        df = pd.DataFrame(self.contactos)
+        # Guardar en CSV fila a fila, sin construir una copia tabular de los contactos
         csv_filename = os.path.join(directorio, f'resultados_{timestamp}.csv')
-        df.to_csv(csv_filename, index=False)
+        with open(csv_filename, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=self._campos_exportacion())
+            writer.writeheader()
+            writer.writerows(self.contactos)
         
         # Guardar en JSON
         json_filename = os.path.join(directorio, f'resultados_{timestamp}.json')
-        with open(json_filename, 'w', encoding='utf-8') as f:
-            json.dump(self.contactos, f, ensure_ascii=False, indent=4)
+        with open(json_filename, 'wb') as f:
+            f.write(orjson.dumps(self.contactos, option=orjson.OPT_INDENT_2))
         
-        self.logger.info(f"Resultados guardados en {csv_filename} y {json_filename}")
+        self.logger.info("Resultados guardados en %s y %s", csv_filename, json_filename)
 
-        # Guardar las estadísticas de forma persistente
-        self.guardar_estadisticas()
+        # Guardar las estadísticas de forma persistente, con la misma marca de tiempo
+        self.guardar_estadisticas(timestamp)
     
     def obtener_estadisticas(self) -> Dict[str, int]:
         """
@@ -160,32 +266,37 @@ class GestorDatos:
         """
         return {
             "total_contactos": len(self.contactos),
-            "con_email": sum(1 for c in self.contactos if 'email' in c and c['email']),
-            "con_telefono": sum(1 for c in self.contactos if 'telefono' in c and c['telefono']),
-            "comunidades": len(set(c.get('zona') for c in self.contactos if c.get('tipo_zona') == 'comunidad')),
-            "ciudades": len(set(c.get('zona') for c in self.contactos if c.get('tipo_zona') == 'ciudad')),
-            "alta_relevancia": sum(1 for c in self.contactos if c.get('relevancia', 0) >= 70),
-            "media_relevancia": sum(1 for c in self.contactos if 40 <= c.get('relevancia', 0) < 70)
+            "con_email": self.total_con_email,
+            "con_telefono": self.total_con_telefono,
+            "comunidades": len(self.zonas_comunidad),
+            "ciudades": len(self.zonas_ciudad),
+            "alta_relevancia": self.total_alta_relevancia,
+            "media_relevancia": self.total_media_relevancia
         }
 
-    def guardar_estadisticas(self) -> None:
+    def guardar_estadisticas(self, timestamp: Optional[str] = None) -> None:
         """
         Guarda las estadísticas en archivos CSV y JSON.
+        
+        Args:
+            timestamp: Marca de tiempo de los nombres de archivo (por defecto, la actual)
         """
         stats = self.obtener_estadisticas()
         # Obtener directorio de guardado desde la configuración
         directorio = self.config.get('guardado', {}).get('directorio', 'results')
         os.makedirs(directorio, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # Guardar en CSV
-        df_stats = pd.DataFrame([stats])
+        # Guardar en CSV (una cabecera y una fila: no hace falta un DataFrame)
         csv_filename = os.path.join(directorio, f'estadisticas_{timestamp}.csv')
-        df_stats.to_csv(csv_filename, index=False)
+        with open(csv_filename, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(stats.keys())
+            writer.writerow(stats.values())
         
         # Guardar en JSON
         json_filename = os.path.join(directorio, f'estadisticas_{timestamp}.json')
-        with open(json_filename, 'w', encoding='utf-8') as f:
-            json.dump(stats, f, ensure_ascii=False, indent=4)
+        with open(json_filename, 'wb') as f:
+            f.write(orjson.dumps(stats, option=orjson.OPT_INDENT_2))
         
-        self.logger.info(f"Estadísticas guardadas en {csv_filename} y {json_filename}")
+        self.logger.info("Estadísticas guardadas en %s y %s", csv_filename, json_filename)
@@ -1,8 +1,24 @@
 import os
-import json
+import queue
+import atexit
 import logging
-from datetime import datetime
-from typing import Dict, Any, List, Tuple
+import logging.handlers
+import orjson
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Dict, Any, Iterable, List, Set, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+if TYPE_CHECKING:
+    import requests
+
+# Tamaño máximo de cada archivo de log antes de rotar y número de copias conservadas
+LOG_MAX_BYTES = 50 * 1024 * 1024
+LOG_COPIAS = 5
+
+# Loggers del módulo, resueltos una sola vez en lugar de en cada llamada
+logger = logging.getLogger('Prospector')
+logger_utils = logging.getLogger('Utils')
 
 def cargar_configuracion() -> Dict[str, Any]:
     """
@@ -13,26 +29,27 @@ def cargar_configuracion() -> Dict[str, Any]:
     """
     try:
         # Cargar configuración principal
-        with open('config/config.json', 'r', encoding='utf-8') as f:
-            config = json.load(f)
+        with open('config/config.json', 'rb') as f:
+            config = orjson.loads(f.read())
         
         # Cargar keywords
-        with open('config/keywords.json', 'r', encoding='utf-8') as f:
-            keywords = json.load(f)
+        with open('config/keywords.json', 'rb') as f:
+            keywords = orjson.loads(f.read())
         
         # Cargar regiones
-        with open('config/regiones.json', 'r', encoding='utf-8') as f:
-            regiones = json.load(f)
+        with open('config/regiones.json', 'rb') as f:
+            regiones = orjson.loads(f.read())
         
         # Cargar filtros de búsqueda (si existe)
         filtros_busqueda = {}
-        if os.path.exists('config/filtros_busqueda.json'):
-            try:
-                with open('config/filtros_busqueda.json', 'r', encoding='utf-8') as f:
-                    filtros_busqueda = json.load(f)
-                logging.getLogger('Utils').info("Filtros de búsqueda cargados correctamente")
-            except Exception as e:
-                logging.getLogger('Utils').error(f"Error al cargar filtros de búsqueda: {str(e)}")
+        try:
+            with open('config/filtros_busqueda.json', 'rb') as f:
+                filtros_busqueda = orjson.loads(f.read())
+            logger_utils.info("Filtros de búsqueda cargados correctamente")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger_utils.error(f"Error al cargar filtros de búsqueda: {str(e)}")
         
         # Combinar todo
         config['keywords'] = keywords
@@ -44,17 +61,20 @@ def cargar_configuracion() -> Dict[str, Any]:
         print(f"Error al cargar configuración: {str(e)}")
         # Valores por defecto si falla la carga
         return {
-            "google_api": {"api_key": "", "cx_id": "", "resultados_por_busqueda": 5},
-            "selenium": {"headless": True, "timeout": 10},
+            "google_api": {"api_key": "", "cx_id": "", "resultados_por_busqueda": 5, "cache_dias": 7},
+            "selenium": {"headless": True, "timeout": 10, "drivers": 1, "driver_path": ""},
             "delays": {"entre_busquedas": [3, 6], "entre_extracciones": [1, 3]},
+            "concurrencia": {"extracciones": 8, "procesos_analisis": 0},
             "modo_prueba": True,
             "logs": {"level": "INFO", "rotation": True},
-            "guardado": {"intervalo": 300},
+            "guardado": {"intervalo": 300, "lote": 500, "checkpoint_cada": 10, "contador_cada": 10},
             "keywords": [],
             "regiones": {"comunidades": [], "ciudades": {}},
             "filtros_busqueda": {},
             "umbral_relevancia": 40,
-            "filtrar_sin_telefono": False
+            "filtrar_sin_telefono": False,
+            "max_bytes_pagina": 262144,
+            "robots_cache_horas": 6
         }
 
 def setup_logging() -> logging.Logger:
@@ -69,16 +89,24 @@ def setup_logging() -> logging.Logger:
     
     log_filename = f'logs/prospeccion_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
     
+    # Los hilos de extracción solo encolan el registro (ya formateado por el
+    # QueueHandler); el hilo del listener escribe a disco y a consola
+    cola_logs = queue.SimpleQueue()
+    manejador_archivo = logging.handlers.RotatingFileHandler(
+        log_filename, maxBytes=LOG_MAX_BYTES, backupCount=LOG_COPIAS,
+        encoding='utf-8', delay=True
+    )
+    listener = logging.handlers.QueueListener(cola_logs, manejador_archivo, logging.StreamHandler())
+    listener.start()
+    atexit.register(listener.stop)
+    
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_filename),
-            logging.StreamHandler()
-        ]
+        handlers=[logging.handlers.QueueHandler(cola_logs)]
     )
     
-    return logging.getLogger('Prospector')
+    return logger
 
 def filtrar_parametros_prueba(config: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -93,22 +121,44 @@ def filtrar_parametros_prueba(config: Dict[str, Any]) -> Dict[str, Any]:
     if not config.get('modo_prueba', False):
         return config
     
-    # Copia para no modificar el original
-    prueba_config = config.copy()
+    # Copia superficial: solo se crean nuevos los valores que se recortan, para
+    # no modificar los diccionarios anidados de la configuración original
+    regiones = config['regiones']
+    comunidades = regiones['comunidades'][:2]
     
-    # Limitar keywords
-    prueba_config['keywords'] = prueba_config['keywords'][:2]
-    
-    # Limitar comunidades
-    prueba_config['regiones']['comunidades'] = prueba_config['regiones']['comunidades'][:2]
+    # Limitar ciudades; solo se recorren las de las comunidades seleccionadas
+    ciudades = {
+        comunidad: regiones['ciudades'][comunidad][:2]
+        for comunidad in comunidades
+        if comunidad in regiones['ciudades']
+    }
     
-    # Limitar ciudades
-    for comunidad in prueba_config['regiones']['comunidades']:
-        if comunidad in prueba_config['regiones']['ciudades']:
-            prueba_config['regiones']['ciudades'][comunidad] = prueba_config['regiones']['ciudades'][comunidad][:2]
+    prueba_config = {
+        **config,
+        'keywords': config['keywords'][:2],
+        'regiones': {**regiones, 'comunidades': comunidades, 'ciudades': ciudades}
+    }
     
     return prueba_config
 
+def _escribir_json_atomico(ruta: str, datos: Any) -> None:
+    """
+    Escribe un JSON en un archivo temporal y lo renombra sobre el destino.
+    
+    os.replace es atómico, así que una interrupción nunca deja el archivo a medias;
+    el fsync previo asegura que tras un corte de luz no se renombre un temporal vacío.
+    
+    Args:
+        ruta: Ruta del archivo destino
+        datos: Datos a serializar (diccionario o dataclass)
+    """
+    ruta_tmp = f"{ruta}.tmp"
+    with open(ruta_tmp, 'wb') as f:
+        f.write(orjson.dumps(datos, option=orjson.OPT_INDENT_2))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(ruta_tmp, ruta)
+
 def gestionar_contador_busquedas() -> Tuple[int, str]:
     """
     Gestiona el contador de búsquedas diarias, reiniciándolo si es un nuevo día.
@@ -116,7 +166,7 @@ def gestionar_contador_busquedas() -> Tuple[int, str]:
     Returns:
         Tuple[int, str]: (búsquedas realizadas hoy, fecha actual en formato YYYY-MM-DD)
     """
-    fecha_actual = datetime.now().strftime("%Y-%m-%d")
+    fecha_actual = date.today().isoformat()
     ruta_contador = 'config/contador_busquedas.json'
     
     # Datos por defecto
@@ -125,24 +175,25 @@ def gestionar_contador_busquedas() -> Tuple[int, str]:
         "busquedas_realizadas": 0
     }
     
-    # Verificar si existe el archivo y cargarlo
-    if os.path.exists(ruta_contador):
-        try:
-            with open(ruta_contador, 'r', encoding='utf-8') as f:
-                datos_contador = json.load(f)
-                
-            # Si es un nuevo día, reiniciar contador
-            if datos_contador.get("fecha") != fecha_actual:
-                datos_contador = {
-                    "fecha": fecha_actual,
-                    "busquedas_realizadas": 0
-                }
-                logging.getLogger('Prospector').info(f"Nuevo día detectado. Contador reiniciado a 0.")
-            else:
-                logging.getLogger('Prospector').info(f"Continuando con {datos_contador['busquedas_realizadas']} búsquedas previas realizadas hoy.")
-                
-        except Exception as e:
-            logging.getLogger('Prospector').error(f"Error al cargar contador de búsquedas: {str(e)}")
+    # Cargar el archivo si existe (abrirlo directamente evita un stat previo)
+    try:
+        with open(ruta_contador, 'rb') as f:
+            datos_contador = orjson.loads(f.read())
+            
+        # Si es un nuevo día, reiniciar contador
+        if datos_contador.get("fecha") != fecha_actual:
+            datos_contador = {
+                "fecha": fecha_actual,
+                "busquedas_realizadas": 0
+            }
+            logger.info(f"Nuevo día detectado. Contador reiniciado a 0.")
+        else:
+            logger.info(f"Continuando con {datos_contador['busquedas_realizadas']} búsquedas previas realizadas hoy.")
+            
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.error(f"Error al cargar contador de búsquedas: {str(e)}")
     
     return datos_contador["busquedas_realizadas"], fecha_actual
 
@@ -163,58 +214,152 @@ def actualizar_contador_busquedas(busquedas_realizadas: int, fecha: str) -> None
     
     try:
         os.makedirs('config', exist_ok=True)
-        with open(ruta_contador, 'w', encoding='utf-8') as f:
-            json.dump(datos_contador, f, ensure_ascii=False, indent=4)
+        _escribir_json_atomico(ruta_contador, datos_contador)
         
-        logging.getLogger('Prospector').info(f"Contador actualizado: {busquedas_realizadas} búsquedas realizadas el {fecha}")
+        logger.info(f"Contador actualizado: {busquedas_realizadas} búsquedas realizadas el {fecha}")
     except Exception as e:
-        logging.getLogger('Prospector').error(f"Error al guardar contador de búsquedas: {str(e)}")
+        logger.error(f"Error al guardar contador de búsquedas: {str(e)}")
+
+@dataclass(slots=True)
+class PuntoControl:
+    """Posición de la búsqueda guardada en config/checkpoint.json para poder reanudarla."""
+    activo: bool = False
+    comunidad_actual: str = ""
+    comunidad_idx: int = 0
+    keyword_actual: str = ""
+    keyword_idx: int = 0
+    ciudad_actual: str = ""
+    ciudad_idx: int = 0
+    en_ciudad: bool = False
+    comunidades_completadas: List[str] = field(default_factory=list)
+    fecha_checkpoint: str = ""
 
-def guardar_punto_control(estado: Dict[str, Any]) -> None:
-    """Guarda el punto de control actual de la búsqueda."""
+def guardar_punto_control(punto: PuntoControl) -> None:
+    """
+    Guarda el punto de control actual de la búsqueda.
+    
+    Args:
+        punto: Punto de control a guardar (la fecha se rellena al guardar)
+    """
     ruta_checkpoint = 'config/checkpoint.json'
     
     try:
         os.makedirs('config', exist_ok=True)
-        with open(ruta_checkpoint, 'w', encoding='utf-8') as f:
-            json.dump(estado, f, ensure_ascii=False, indent=4)
+        punto.fecha_checkpoint = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        _escribir_json_atomico(ruta_checkpoint, punto)
         
-        logging.getLogger('Prospector').info(f"Punto de control guardado: {estado['comunidad_actual']}, {estado['keyword_actual']}")
+        logger.info(f"Punto de control guardado: {punto.comunidad_actual}, {punto.keyword_actual}")
     except Exception as e:
-        logging.getLogger('Prospector').error(f"Error al guardar punto de control: {str(e)}")
+        logger.error(f"Error al guardar punto de control: {str(e)}")
 
-def cargar_punto_control() -> Dict[str, Any]:
+def cargar_punto_control() -> PuntoControl:
     """Carga el último punto de control guardado."""
     ruta_checkpoint = 'config/checkpoint.json'
     
-    # Estado por defecto (inicio de búsqueda)
-    estado_defecto = {
-        "activo": False,
-        "comunidad_actual": "",
-        "comunidad_idx": 0,
-        "keyword_actual": "",
-        "keyword_idx": 0,
-        "ciudad_actual": "",
-        "ciudad_idx": 0,
-        "en_ciudad": False,
-        "comunidades_completadas": [],
-        "fecha_checkpoint": ""
-    }
-    
-    if not os.path.exists(ruta_checkpoint):
-        return estado_defecto
-    
     try:
-        with open(ruta_checkpoint, 'r', encoding='utf-8') as f:
-            estado = json.load(f)
+        with open(ruta_checkpoint, 'rb') as f:
+            estado = orjson.loads(f.read())
         
-        logging.getLogger('Prospector').info(f"Punto de control cargado: {estado.get('comunidad_actual', 'N/A')}, {estado.get('keyword_actual', 'N/A')}")
+        logger.info(f"Punto de control cargado: {estado.get('comunidad_actual', 'N/A')}, {estado.get('keyword_actual', 'N/A')}")
         
         # Verificar si el checkpoint es válido y se marcó como activo
         if not estado.get("activo", False):
-            return estado_defecto
-            
-        return estado
+            return PuntoControl()
+        
+        campos = PuntoControl.__dataclass_fields__
+        return PuntoControl(**{clave: valor for clave, valor in estado.items() if clave in campos})
+    except FileNotFoundError:
+        # Estado por defecto (inicio de búsqueda)
+        return PuntoControl()
+    except Exception as e:
+        logger.error(f"Error al cargar punto de control: {str(e)}")
+        return PuntoControl()
+
+def normalizar_url(url: str) -> str:
+    """
+    Normaliza una URL para detectar duplicados antes de extraerla.
+    
+    Elimina el fragmento y la barra final, y pasa a minúsculas el esquema y el
+    dominio (la ruta y la query se conservan porque pueden distinguir páginas).
+    
+    Args:
+        url: URL a normalizar
+        
+    Returns:
+        URL normalizada
+    """
+    partes = urlsplit(url.strip())
+    ruta = partes.path.rstrip('/')
+    return urlunsplit((partes.scheme.lower(), partes.netloc.lower(), ruta, partes.query, ''))
+
+def cargar_urls_vistas() -> Set[str]:
+    """Carga las URLs ya procesadas en ejecuciones anteriores."""
+    ruta_urls = 'results/urls_vistas.txt'
+    
+    try:
+        with open(ruta_urls, 'r', encoding='utf-8') as f:
+            urls = {linea.rstrip('\n') for linea in f if linea.strip()}
+        
+        logger.info(f"Cargadas {len(urls)} URLs procesadas previamente")
+        return urls
+    except FileNotFoundError:
+        return set()
     except Exception as e:
-        logging.getLogger('Prospector').error(f"Error al cargar punto de control: {str(e)}")
-        return estado_defecto
\ No newline at end of file
+        logger.error(f"Error al cargar URLs vistas: {str(e)}")
+        return set()
+
+def registrar_urls_vistas(urls: Iterable[str]) -> None:
+    """
+    Añade URLs procesadas al registro persistente para omitirlas en ejecuciones posteriores.
+    
+    El archivo solo crece por el final (una URL por línea), así que cada búsqueda
+    escribe únicamente sus URLs nuevas y una interrupción no pierde lo ya registrado.
+    
+    Args:
+        urls: URLs normalizadas recién procesadas
+    """
+    ruta_urls = 'results/urls_vistas.txt'
+    
+    try:
+        os.makedirs('results', exist_ok=True)
+        with open(ruta_urls, 'a', encoding='utf-8') as f:
+            f.writelines(f"{url}\n" for url in urls)
+    except Exception as e:
+        logger.error(f"Error al registrar URLs vistas: {str(e)}")
+
+def crear_sesion_http(config: Dict[str, Any]) -> 'requests.Session':
+    """
+    Crea la sesión HTTP compartida por el buscador y los extractores.
+    
+    Reutilizar la sesión mantiene abiertas las conexiones (keep-alive) y evita
+    repetir el handshake TCP/TLS en cada petición al mismo host. Los errores
+    transitorios (429 y 5xx) se reintentan con espera exponencial respetando la
+    cabecera Retry-After; la API de búsqueda admite más reintentos que las webs.
+    
+    Args:
+        config: Configuración del sistema
+        
+    Returns:
+        Sesión de requests con un pool de conexiones dimensionado para la concurrencia configurada
+    """
+    # Importación diferida: requests solo hace falta al ejecutar la búsqueda
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    hilos = config.get('concurrencia', {}).get('extracciones', 8)
+    tamano_pool = max(10, hilos)
+    
+    def reintentos(total: int) -> Retry:
+        return Retry(total=total, backoff_factor=1, backoff_max=30, backoff_jitter=1,
+                     status_forcelist=(429, 500, 502, 503, 504), allowed_methods=frozenset({'GET'}),
+                     respect_retry_after_header=True, raise_on_status=False)
+    
+    adaptador = HTTPAdapter(pool_connections=tamano_pool, pool_maxsize=tamano_pool, max_retries=reintentos(2))
+    adaptador_api = HTTPAdapter(max_retries=reintentos(5))
+    
+    sesion = requests.Session()
+    sesion.mount('http://', adaptador)
+    sesion.mount('https://', adaptador)
+    sesion.mount('https://customsearch.googleapis.com/', adaptador_api)
+    return sesion